@@ -13,6 +13,7 @@ from .modular import *
 from .sqrtmod import *
 from .stuff import *
 from .chains import *
+from .dlog import *
 from . import ecc
 
 
@@ -19,10 +19,62 @@ def len_in_bits(n):
         return len(bin(n)) - 2
 
 
-def randint_bits(size):
-    low = 1 << (size - 1)
-    hi = (1 << size) - 1
-    return random.randint(low, hi)
+SECURE_RNG = random.SystemRandom()
+
+
+def seeded_rng(seed=None):
+    """
+    Return a new fast PRNG (random.Random) seeded with @seed.
+    Give each worker its own to get reproducible results without
+    contending on the global random state.
+    """
+    return random.Random(seed)
+
+
+def get_rng(rng=None):
+    """
+    Return @rng, or the global random module if @rng is None.
+    Any object with random.Random's interface may be used:
+    e.g. SECURE_RNG (os.urandom based) or seeded_rng(seed).
+    """
+    if rng is None:
+        return random
+    return rng
+
+
+def randint_bits(size, rng=None):
+    """
+    Return random number with exactly @size bits.
+    """
+    rng = get_rng(rng)
+    if size < 1:
+        raise ValueError("size must be positive: %s" % size)
+    if size == 1:
+        return 1
+    return rng.getrandbits(size - 1) | (1 << (size - 1))
+
+
+def randints_bits(size, count, rng=None):
+    """
+    Return list of @count random numbers with exactly @size bits.
+    All of them are cut from a single getrandbits call.
+    """
+    rng = get_rng(rng)
+    if size < 1:
+        raise ValueError("size must be positive: %s" % size)
+    if count <= 0:
+        return []
+
+    step = size - 1
+    top = 1 << step
+    mask = top - 1
+    bits = rng.getrandbits(step * count) if step else 0
+
+    res = []
+    for i in xrange(count):
+        res.append((bits & mask) | top)
+        bits >>= step
+    return res
 
 
 def ceil(x, y):
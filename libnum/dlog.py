@@ -0,0 +1,274 @@
+#-*- coding:utf-8 -*-
+
+"""
+Discrete logarithm methods: g**x = h in a cyclic group.
+
+A group is any object with:
+    .identity        - neutral element
+    .op(x, y)        - group operation
+    .power(x, n)     - x**n (n-fold operation), n may be negative
+    .inverse(x)      - inverse element
+Group elements must be hashable.
+Zmod (multiplicative group) and ecc.Curve (points) provide it.
+"""
+
+from .compat import xrange
+from .common import gcd, nroot, len_in_bits, get_rng
+from .modular import invmod, solve_crt, Zmod, _carmichael_lambda
+
+
+__all__ = ("discrete_log bsgs pollard_rho kangaroo pohlig_hellman "
+           "element_order").split()
+
+
+# subgroups of larger prime order are solved by Pollard's rho
+_BSGS_LIMIT = 1 << 32
+
+
+def discrete_log(g, h, group, order=None, factors=None):
+    """
+    Return least x >= 0 : g**x = h in @group, ValueError if there is none.
+    @order - multiple of the order of @g, optional for Zmod
+             (Carmichael's lambda is used) and for curves
+             with known points count
+    @factors - factorization of @order, optional
+    """
+    if order is None:
+        order, factors = _group_order(group)
+    return pohlig_hellman(g, h, order, group, factors)
+
+
+def bsgs(g, h, bound, group):
+    """
+    Baby-step giant-step: return x in [0, @bound) : g**x = h.
+    Raise ValueError if there is none.
+    Table is keyed by the elements themselves (O(sqrt(@bound)) entries).
+    """
+    if bound <= 0:
+        raise ValueError("bound must be positive: %s" % bound)
+
+    m = nroot(bound - 1, 2) + 1
+    table = {}
+    cur = group.identity
+    for j in xrange(m):
+        table.setdefault(cur, j)
+        cur = group.op(cur, g)
+
+    giant = group.inverse(cur)  # g**-m
+    cur = h
+    for i in xrange(m):
+        j = table.get(cur)
+        if j is not None:
+            x = i * m + j
+            if x < bound:
+                return x
+        cur = group.op(cur, giant)
+    raise ValueError("no discrete logarithm for given values")
+
+
+def pollard_rho(g, h, order, group, rng=None):
+    """
+    Pollard's rho: return x : g**x = h, @order - order of @g
+    (should be prime or have small cofactors).
+    Memory usage is constant (Floyd's cycle finding).
+    Raise ValueError if there is no solution.
+    """
+    rng = get_rng(rng)
+    identity = group.identity
+    op = group.op
+
+    def step(x, a, b):
+        i = hash(x) % 3
+        if i == 0:
+            return op(x, g), (a + 1) % order, b
+        if i == 1:
+            return op(x, x), (2 * a) % order, (2 * b) % order
+        return op(x, h), a, (b + 1) % order
+
+    if h == identity:
+        return 0
+
+    for attempt in xrange(_RHO_ATTEMPTS):
+        a = rng.randint(0, order - 1)
+        b = rng.randint(0, order - 1)
+        x = op(group.power(g, a), group.power(h, b))
+        x1, a1, b1 = x, a, b
+        x2, a2, b2 = x, a, b
+        while True:
+            x1, a1, b1 = step(x1, a1, b1)
+            x2, a2, b2 = step(*step(x2, a2, b2))
+            if x1 == x2:
+                break
+
+        # g**(a1 - a2) = h**(b2 - b1)
+        r = (b2 - b1) % order
+        if r == 0:
+            continue
+        d = gcd(r, order)
+        if d > _RHO_MAX_GCD or (a1 - a2) % d:
+            continue
+        n = order // d
+        x = ((a1 - a2) // d * invmod(r // d, n)) % n if n > 1 else 0
+        for k in xrange(d):
+            if group.power(g, x) == h:
+                return x
+            x += n
+    raise ValueError("no discrete logarithm for given values")
+
+
+_RHO_ATTEMPTS = 32
+_RHO_MAX_GCD = 1 << 16
+
+
+def kangaroo(g, h, low, high, group, rng=None):
+    """
+    Pollard's kangaroo (lambda): return x in [@low, @high] : g**x = h.
+    Takes O(sqrt(high - low)) operations and constant memory.
+    Raise ValueError if solution is not found
+    (method is probabilistic, solution may be missed with small chance).
+    """
+    if high < low:
+        raise ValueError("empty interval: [%s, %s]" % (low, high))
+
+    rng = get_rng(rng)
+    width = high - low
+    if width < _KANGAROO_BSGS_WIDTH:
+        x = bsgs(g, group.op(h, group.power(g, -low)), width + 1, group)
+        return low + x
+
+    # jumps are powers of two, mean jump is about sqrt(width) / 2
+    k = (len_in_bits(width) + 1) // 2 + 1
+    jumps = [1 << i for i in xrange(k)]
+    jump_points = [group.power(g, s) for s in jumps]
+    mean = sum(jumps) // k
+    tame_steps = 4 * mean
+
+    for attempt in xrange(_KANGAROO_ATTEMPTS):
+        salt = rng.randint(0, k - 1)
+
+        tame = group.power(g, high)
+        tame_dist = 0
+        for i in xrange(tame_steps):
+            j = (hash(tame) + salt) % k
+            tame = group.op(tame, jump_points[j])
+            tame_dist += jumps[j]
+
+        # trap is at g**(high + tame_dist)
+        wild = h
+        wild_dist = 0
+        limit = width + tame_dist
+        while wild_dist <= limit:
+            if wild == tame:
+                x = high + tame_dist - wild_dist
+                if low <= x <= high:
+                    return x
+                break
+            j = (hash(wild) + salt) % k
+            wild = group.op(wild, jump_points[j])
+            wild_dist += jumps[j]
+    raise ValueError("no discrete logarithm found in the interval")
+
+
+_KANGAROO_ATTEMPTS = 8
+_KANGAROO_BSGS_WIDTH = 1 << 10
+
+
+def pohlig_hellman(g, h, order, group, factors=None):
+    """
+    Pohlig-Hellman: return least x >= 0 : g**x = h.
+    @order - multiple of the order of @g,
+    @factors - factorization of @order (computed if not given).
+    Subgroups of prime order are solved by bsgs or pollard_rho.
+    Raise ValueError if there is no solution.
+    """
+    if factors is None:
+        from .factorize import factorize
+        factors = factorize(order)
+
+    order, factors = _reduce_order(g, order, factors, group)
+
+    rems = []
+    mods = []
+    for q, e in factors.items():
+        qe = q ** e
+        cofactor = order // qe
+        gi = group.power(g, cofactor)
+        hi = group.power(h, cofactor)
+        rems.append(_dlog_prime_power(gi, hi, q, e, group))
+        mods.append(qe)
+
+    x = solve_crt(rems, mods) % order if mods else 0
+    if group.power(g, x) != h:
+        raise ValueError("no discrete logarithm for given values")
+    return x
+
+
+def element_order(g, order, group, factors=None):
+    """
+    Return order of @g, @order - any multiple of it.
+    @factors - factorization of @order (computed if not given).
+    """
+    if factors is None:
+        from .factorize import factorize
+        factors = factorize(order)
+    return _reduce_order(g, order, factors, group)[0]
+
+
+def _reduce_order(g, order, factors, group):
+    """
+    Return (order of @g, its factorization),
+    @order - multiple of the order of @g with @factors.
+    """
+    identity = group.identity
+    if group.power(g, order) != identity:
+        raise ValueError("given order is not a multiple of the element order")
+
+    res = {}
+    for q, e in factors.items():
+        if q < 2:  # factorize(1) == {1: 1}
+            continue
+        for i in xrange(e):
+            if group.power(g, order // q) != identity:
+                break
+            order //= q
+            e -= 1
+        if e:
+            res[q] = e
+    return order, res
+
+
+def _dlog_prime_power(g, h, q, e, group):
+    """
+    Return x mod q**e : g**x = h, order of @g is q**e.
+    """
+    # gamma has order q, digits of x are logarithms by gamma
+    gamma = group.power(g, q ** (e - 1))
+    g_inv = group.inverse(g)
+    x = 0
+    qi = 1
+    for i in xrange(e):
+        hk = group.power(group.op(h, group.power(g_inv, x)), q ** (e - 1 - i))
+        if q < _BSGS_LIMIT:
+            d = bsgs(gamma, hk, q, group)
+        else:
+            d = pollard_rho(gamma, hk, q, group)
+        x += d * qi
+        qi *= q
+    return x
+
+
+def _group_order(group):
+    """
+    Return (multiple of any element order, its factorization or None).
+    """
+    if isinstance(group, Zmod):
+        return _carmichael_lambda(group.n, group.factors)
+
+    points_count = getattr(group, "points_count", None)
+    if points_count is not None:
+        return points_count, None
+    order = getattr(group, "order", None)
+    cofactor = getattr(group, "cofactor", None)
+    if order is not None and cofactor is not None:
+        return order * cofactor, None
+    raise ValueError("group order is unknown, give it explicitly")
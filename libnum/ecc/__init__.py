@@ -0,0 +1,10 @@
+#-*- coding:utf-8 -*-
+
+from .curve import NULL_POINT, Curve
+from .point import Point
+from .montgomery import MontgomeryCurve
+from .edwards import EdwardsCurve
+from .count import count_points
+from .curves import CURVE_NAMES, get_curve
+from .field import ExtensionField, FieldElement
+from .pairing import embedding_degree, tate_pairing, weil_pairing
@@ -0,0 +1,142 @@
+#-*- coding:utf-8 -*-
+
+"""
+Vectorized (NumPy) enumeration of points on curves over small prime
+fields (p < 2**32): right part of the equation is computed for a block
+of x at once, square roots are taken from a table of squares (small p)
+or by vectorized Tonelli-Shanks.
+NumPy is required for this module only.
+"""
+
+import numpy
+
+from ..compat import xrange
+from ..common import extract_prime_power
+from ..sqrtmod import _nonresidue
+
+
+# square roots are looked up in a table of this size at most
+_TABLE_LIMIT = 1 << 24
+_MAX_MODULUS = 1 << 32
+
+
+def iter_points_arrays(curve, start=0, end=None, block_size=1 << 16):
+    """
+    Yield (xs, ys) pairs of uint64 arrays - points with x in [@start, @end]
+    (whole field by default), @block_size values of x at a time,
+    points are sorted by x.
+    """
+    p = curve.module
+    if p >= _MAX_MODULUS:
+        raise ValueError("modulus is too large for vectorized arithmetic")
+    if end is None:
+        end = p - 1
+    if block_size < 1:
+        raise ValueError("block_size must be positive: %s" % block_size)
+
+    a = numpy.uint64(curve.a % p)
+    b = numpy.uint64(curve.b % p)
+    P = numpy.uint64(p)
+    if p < _TABLE_LIMIT:
+        table = _sqrt_table(p)
+        sqrt = lambda v: table[v]
+    else:
+        sqrt = lambda v: _sqrt_tonelli_shanks(v, p)
+
+    for lo in xrange(start, end + 1, block_size):
+        hi = min(lo + block_size, end + 1)
+        x = numpy.arange(lo, hi, dtype=numpy.uint64)
+        v = (x * x % P + a) % P * x % P
+        v = (v + b) % P
+
+        y = sqrt(v)
+        has = y >= 0
+        x, y = x[has], y[has].astype(numpy.uint64)
+
+        # second root p - y for y != 0
+        nz = y != 0
+        xs = numpy.concatenate((x, x[nz]))
+        ys = numpy.concatenate((y, P - y[nz]))
+        order = numpy.argsort(xs, kind="stable")
+        yield xs[order], ys[order]
+
+
+def _sqrt_table(p):
+    """
+    Array r : r[y*y % p] = y, -1 for nonresidues.
+    """
+    table = numpy.full(p, -1, dtype=numpy.int32)
+    y = numpy.arange((p + 1) // 2, dtype=numpy.uint64)
+    table[y * y % numpy.uint64(p)] = y.astype(numpy.int32)
+    return table
+
+
+def _powmod(v, e, p):
+    """
+    v**e mod p elementwise, @v - uint64 array of values < p < 2**32.
+    """
+    P = numpy.uint64(p)
+    res = numpy.ones_like(v)
+    v = v.copy()
+    while e:
+        if e & 1:
+            res = res * v % P
+        v = v * v % P
+        e >>= 1
+    return res
+
+
+def _sqrt_tonelli_shanks(v, p):
+    """
+    Square roots of uint64 array @v modulo prime p < 2**32,
+    int64 array with -1 for nonresidues.
+    """
+    P = numpy.uint64(p)
+    res = numpy.full(len(v), -1, dtype=numpy.int64)
+
+    if p & 3 == 3:
+        r = _powmod(v, (p + 1) >> 2, p)
+        good = r * r % P == v
+        res[good] = r[good].astype(numpy.int64)
+        return res
+
+    zero = v == 0
+    res[zero] = 0
+    # Euler's criterion
+    qr = (_powmod(v, (p - 1) >> 1, p) == 1) & ~zero
+    v = v[qr]
+
+    s, q = extract_prime_power(p - 1, 2)
+    z = _nonresidue(p)
+    c = numpy.full(len(v), pow(z, q, p), dtype=numpy.uint64)
+    t = _powmod(v, q, p)
+    r = _powmod(v, (q + 1) >> 1, p)
+    m = numpy.full(len(v), s, dtype=numpy.int64)
+
+    active = t != 1
+    while active.any():
+        # least i > 0 : t**(2**i) = 1
+        i = numpy.zeros(len(v), dtype=numpy.int64)
+        found = ~active
+        tt = t.copy()
+        for k in xrange(1, s):
+            tt = tt * tt % P
+            new = ~found & (tt == 1)
+            i[new] = k
+            found |= new
+
+        # b = c**(2**(m - i - 1))
+        e = numpy.where(active, m - i - 1, 0)
+        bb = c.copy()
+        for k in xrange(int(e.max())):
+            sq = e > k
+            bb[sq] = bb[sq] * bb[sq] % P
+
+        m = numpy.where(active, i, m)
+        c = numpy.where(active, bb * bb % P, c)
+        t = numpy.where(active, t * c % P, t)
+        r = numpy.where(active, r * bb % P, r)
+        active = t != 1
+
+    res[qr] = r.astype(numpy.int64)
+    return res
@@ -0,0 +1,341 @@
+#-*- coding:utf-8 -*-
+
+"""
+Counting points on y^2 = x^3 + ax + b over a prime field:
+    - tiny fields: sum of Legendre symbols;
+    - trace of Frobenius modulo small primes l: Schoof's algorithm
+      (arithmetic modulo division polynomials);
+    - the rest: baby-step giant-step over the Hasse interval with
+      Mestre's trick (points on the curve and on its quadratic twist).
+"""
+
+from ..compat import xrange
+from ..common import nroot, len_in_bits, get_rng
+from ..primes import primes, prime_test
+from ..modular import invmod
+from ..sqrtmod import jacobi_many, jacobi, sqrtmod_prime, _nonresidue
+from .curve import NULL_POINT, _JACOBIAN_NULL, Curve
+from .poly import (_ZeroDivisor, _PolyRing, _poly_add, _poly_sub, _poly_mul,
+                   _poly_pow, _poly_divmod, _poly_gcd)
+
+
+__all__ = ("count_points",)
+
+
+# fields up to this size are counted point by point
+_NAIVE_LIMIT = 1 << 10
+# Schoof's algorithm is run until the number of candidates left for
+# baby-step giant-step drops below 2**(len(p) / 4 + 12) (steps for larger l
+# are more expensive in larger fields), but at most 2**34
+_BSGS_CANDIDATES_BITS = 34
+
+
+def count_points(a, b, p, rng=None):
+    """
+    Return number of points (including null point)
+    on y^2 = x^3 + @a*x + @b over prime field of size @p.
+    Optional arg @rng defines random generator (see get_rng).
+    """
+    if p < 5 or not prime_test(p):
+        raise ValueError("modulus must be a prime greater than 3: %s" % p)
+    a %= p
+    b %= p
+    if (4 * a ** 3 + 27 * b ** 2) % p == 0:
+        raise ValueError("curve is singular")
+
+    if p < _NAIVE_LIMIT:
+        rights = [(x ** 3 + a * x + b) % p for x in xrange(p)]
+        return p + 1 + sum(jacobi_many(rights, p))
+
+    rng = get_rng(rng)
+    # Hasse: |p + 1 - N| <= 2 sqrt(p)
+    width = 2 * nroot(4 * p, 2) + 1
+    candidates = 1 << min(len_in_bits(p) // 4 + 12, _BSGS_CANDIDATES_BITS)
+    residue, modulus = 0, 1
+    for l in primes(1 << 12):
+        if width // modulus <= candidates:
+            break
+        if l == p:
+            continue
+        t = _trace_mod_l(a, b, p, l)
+        # N = p + 1 - t (mod l)
+        residue = _crt_pair(residue, modulus, (p + 1 - t) % l, l)
+        modulus *= l
+    return _count_bsgs(a, b, p, residue, modulus, rng)
+
+
+def _crt_pair(r1, m1, r2, m2):
+    """
+    x (mod m1*m2) : x = r1 (mod m1), x = r2 (mod m2), coprime moduli.
+    """
+    k = ((r2 - r1) * invmod(m1, m2)) % m2
+    return r1 + m1 * k
+
+
+# Schoof's algorithm
+
+def _trace_mod_l(a, b, p, l):
+    """
+    Trace of Frobenius modulo prime @l != @p.
+    Endomorphisms of l-torsion are represented by (u(x), v(x)) meaning
+    (u(x), v(x) * y) modulo h = l-th division polynomial (or its factor,
+    when a zero divisor is met) and y^2 = f(x).
+    """
+    f = [b, a, 0, 1]
+    if l == 2:
+        # t is even iff there is a point of order 2 (a root of f)
+        xp = _PolyRing(f, p).pow([0, 1], p)
+        g = _poly_gcd(_poly_sub(xp, [0, 1], p), f, p)
+        return 0 if len(g) > 1 else 1
+
+    h = _division_polynomial(a, b, p, l)
+    ring = _PolyRing(h, p)
+    # Frobenius: (x^p, y^p) = (x^p, f^((p-1)/2) * y) and its square
+    fp = ring.pow(f, (p - 1) >> 1)
+    xp = ring.pow([0, 1], p)
+    frobenius = [xp, fp, ring.pow(xp, p), ring.mul(ring.pow(fp, p), fp)]
+    while True:
+        try:
+            return _trace_mod_l_ring(ring, a, f, p, l, frobenius)
+        except _ZeroDivisor as e:
+            # any factor of h defined over F_p will do
+            g = e.factor
+            other = _poly_divmod(h, g, p)[0]
+            h = g if len(g) <= len(other) else other
+            ring = _PolyRing(h, p)
+            frobenius = [_poly_divmod(u, h, p)[1] for u in frobenius]
+
+
+def _trace_mod_l_ring(ring, a, f, p, l, frobenius):
+    f = _poly_divmod(f, ring.h, p)[1]
+    xp, yp, xp2, yp2 = frobenius
+    pi = (xp, yp)
+
+    # pi^2 - t*pi + p = 0 on l-torsion
+    point = (_poly_divmod([0, 1], ring.h, p)[1], [1])
+    q = None
+    for bit in bin(p % l)[2:]:
+        q = _ring_point_add(ring, a, f, q, q)
+        if bit == "1":
+            q = _ring_point_add(ring, a, f, q, point)
+    s = _ring_point_add(ring, a, f, (xp2, yp2), q)
+    if s is None:
+        return 0
+
+    # compare x(s) with x(tau * pi) for tau <= (l - 1) / 2,
+    # sign is chosen by y
+    cur = pi
+    for tau in xrange(1, (l + 1) >> 1):
+        if cur[0] == s[0]:
+            if cur[1] == s[1]:
+                return tau
+            return l - tau
+        cur = _ring_point_add(ring, a, f, cur, pi)
+    raise ValueError("Schoof's algorithm failed, modulus is not prime?")
+
+
+def _ring_point_add(ring, a, f, P, Q):
+    """
+    Sum of points (u(x), v(x) * y), None is the null point.
+    """
+    if P is None:
+        return Q
+    if Q is None:
+        return P
+    p = ring.p
+    u1, v1 = P
+    u2, v2 = Q
+    if u1 == u2:
+        if v1 == v2:
+            if not v1:
+                return None
+            # slope = (3u^2 + a) / (2vy) = (3u^2 + a) / (2vf) * y
+            num = ring.mul(u1, u1)
+            num = _poly_add([(3 * c) % p for c in num], [a], p)
+            den = ring.mul([(2 * c) % p for c in v1], f)
+            slope = ring.mul(num, ring.inv(den))
+            x = _poly_sub(ring.mul(ring.mul(slope, slope), f),
+                          [(2 * c) % p for c in u1], p)
+        elif not _poly_add(v1, v2, p):
+            return None
+        else:
+            # v1^2 = v2^2 (mod h), so h has a common factor with v1 - v2
+            raise _ZeroDivisor(_poly_gcd(ring.h, _poly_sub(v1, v2, p), p))
+    else:
+        slope = ring.mul(_poly_sub(v2, v1, p),
+                         ring.inv(_poly_sub(u2, u1, p)))
+        x = _poly_sub(ring.mul(ring.mul(slope, slope), f),
+                      _poly_add(u1, u2, p), p)
+    x = ring.reduce(x)
+    y = _poly_sub(ring.mul(slope, _poly_sub(u1, x, p)), v1, p)
+    return x, y
+
+
+_DIVISION_POLYNOMIALS = {}
+_DIVISION_POLYNOMIALS_SIZE = 64
+
+
+def _division_polynomial(a, b, p, l):
+    """
+    Monic l-th division polynomial of y^2 = x^3 + ax + b, @l is odd.
+    """
+    key = (a, b, p, l)
+    try:
+        return _DIVISION_POLYNOMIALS[key]
+    except KeyError:
+        pass
+
+    # g_n = psi_n for odd n, g_n = psi_n / (2y) for even n,
+    # F = (2y)^2 = 4 (x^3 + ax + b)
+    F = [(4 * b) % p, (4 * a) % p, 0, 4]
+    F2 = _poly_mul(F, F, p)
+    g = {
+        0: [],
+        1: [1],
+        2: [1],
+        3: [(-a * a) % p, (12 * b) % p, (6 * a) % p, 0, 3],
+        4: [c % p for c in (-2 * (a ** 3 + 8 * b * b), -8 * a * b,
+                            -10 * a * a, 40 * b, 10 * a, 0, 2)],
+    }
+
+    def get(n):
+        if n in g:
+            return g[n]
+        m = n >> 1
+        if n & 1:
+            x = _poly_mul(get(m + 2), _poly_pow(get(m), 3, p), p)
+            y = _poly_mul(get(m - 1), _poly_pow(get(m + 1), 3, p), p)
+            if m & 1:
+                y = _poly_mul(y, F2, p)
+            else:
+                x = _poly_mul(x, F2, p)
+            res = _poly_sub(x, y, p)
+        else:
+            x = _poly_mul(get(m + 2), _poly_pow(get(m - 1), 2, p), p)
+            y = _poly_mul(get(m - 2), _poly_pow(get(m + 1), 2, p), p)
+            res = _poly_mul(get(m), _poly_sub(x, y, p), p)
+        g[n] = res
+        return res
+
+    res = get(l)
+    lead = pow(res[-1], p - 2, p)
+    res = [(c * lead) % p for c in res]
+
+    if len(_DIVISION_POLYNOMIALS) >= _DIVISION_POLYNOMIALS_SIZE:
+        _DIVISION_POLYNOMIALS.clear()
+    _DIVISION_POLYNOMIALS[key] = res
+    return res
+
+
+# Baby-step giant-step / Mestre
+
+def _count_bsgs(a, b, p, residue, modulus, rng):
+    """
+    Points count N given N = @residue (mod @modulus).
+    Each random point P on the curve (or on the twist,
+    which has 2p + 2 - N points) refines the congruence:
+    N * P = 0 holds only for N in some residue class
+    modulo modulus * ord(modulus * P).
+    """
+    s = nroot(4 * p, 2)
+    low, high = p + 1 - s, p + 1 + s
+
+    c = _nonresidue(p, rng)
+    curve = Curve(a, b, p)
+    twist = Curve((a * c * c) % p, (b * c * c * c) % p, p)
+
+    on_twist = False
+    while True:
+        first = low + (residue - low) % modulus
+        if first > high:
+            raise ValueError("no points count in Hasse interval, "
+                             "modulus is not prime?")
+        count = (high - first) // modulus + 1
+        if count == 1:
+            return first
+
+        group = curve
+        if on_twist:
+            # candidates for 2p + 2 - N in increasing order
+            group = twist
+            first = 2 * p + 2 - first - (count - 1) * modulus
+        P = _random_point(group, rng)
+
+        Q = group.power(P, modulus)
+        if Q != NULL_POINT:
+            H = group.power(P, -first)
+            t, d = _bsgs_progression(group, Q, H, count)
+            found = first + modulus * t
+            if on_twist:
+                found = 2 * p + 2 - found
+            if d is None:
+                return found
+            modulus *= d
+            residue = found % modulus
+        on_twist = not on_twist
+
+
+def _bsgs_progression(curve, Q, H, count):
+    """
+    Return (t, d): least t in [0, @count) : t*Q = H
+    and least d in [1, @count) : d*Q = 0 (None if there is none).
+    @Q is not null. Steps are made in Jacobian coordinates
+    and normalized with one inversion per batch.
+    """
+    m = nroot(count - 1, 2) + 1
+
+    Qj = curve._to_jacobian(Q)
+    baby = [Qj]
+    for j in xrange(1, m):
+        baby.append(curve._jacobian_add(baby[-1], Qj))
+    baby = curve._to_affine_many(baby)
+
+    d = None
+    table = {NULL_POINT: 0}
+    for j, point in enumerate(baby):
+        if point == NULL_POINT:
+            d = j + 1
+            break
+        table.setdefault(point, j + 1)
+
+    if d is not None:
+        # table has all multiples of Q
+        t = table.get(H)
+    else:
+        # giant steps H - i*m*Q and -i*m*Q
+        giant = curve._to_jacobian(curve.neg(baby[-1]))
+        hs = [curve._to_jacobian(H)]
+        zs = [_JACOBIAN_NULL]
+        for i in xrange(1, m):
+            hs.append(curve._jacobian_add(hs[-1], giant))
+            zs.append(curve._jacobian_add(zs[-1], giant))
+
+        t = None
+        for i, point in enumerate(curve._to_affine_many(hs)):
+            j = table.get(point)
+            if j is not None:
+                t = i * m + j
+                break
+        for i, point in enumerate(curve._to_affine_many(zs)):
+            j = table.get(point)
+            if i and j is not None:
+                d = i * m + j
+                break
+
+    if t is None or t >= count:
+        raise ValueError("no points count in Hasse interval, "
+                         "modulus is not prime?")
+    if d is not None and d >= count:
+        d = None
+    return t, d
+
+
+def _random_point(curve, rng):
+    p = curve.module
+    while True:
+        x = rng.randint(0, p - 1)
+        v = curve.right(x)
+        if v == 0:
+            return (x, 0)
+        if jacobi(v, p) == 1:
+            return (x, sqrtmod_prime(v, p)[0])
@@ -0,0 +1,841 @@
+#-*- coding:utf-8 -*-
+
+import json
+
+from ..compat import xrange
+from ..common import get_rng, len_in_bits, nroot
+from ..sqrtmod import sqrtmod_prime
+from ..modular import invmod
+from ..primes import prime_test
+
+__all__ = ('NULL_POINT', 'Curve')
+
+NULL_POINT = (None, None)
+_JACOBIAN_NULL = (1, 1, 0)
+
+# (max scalar bits, wNAF width)
+_WNAF_WIDTHS = ((64, 2), (192, 3), (512, 4))
+_WNAF_MAX_WIDTH = 5
+
+# multi_power switches from Straus to Pippenger at this number of terms
+_PIPPENGER_THRESHOLD = 64
+
+
+def _wnaf(n, w):
+    """
+    Width-@w NAF of @n > 0: list of digits (least significant first),
+    nonzero digits are odd, |d| < 2**(w-1), any w consecutive digits
+    contain at most one nonzero.
+    """
+    digits = []
+    mod = 1 << w
+    half = mod >> 1
+    while n:
+        if n & 1:
+            d = n & (mod - 1)
+            if d >= half:
+                d -= mod
+            n -= d
+        else:
+            d = 0
+        digits.append(d)
+        n >>= 1
+    return digits
+
+
+def _wnaf_width(bits):
+    for max_bits, width in _WNAF_WIDTHS:
+        if bits <= max_bits:
+            return width
+    return _WNAF_MAX_WIDTH
+
+
+def _cube_root_of_unity(p):
+    """
+    Nontrivial cube root of 1 modulo prime p = 1 (mod 3)
+    """
+    for g in xrange(2, p):
+        r = pow(g, (p - 1) // 3, p)
+        if r != 1:
+            return r
+
+
+def _round_div(a, n):
+    """
+    a / n rounded to the nearest integer (n > 0)
+    """
+    return (2 * a + n) // (2 * n)
+
+
+def _glv_basis(n, lam):
+    """
+    Short vectors (a1, b1), (a2, b2) of the lattice
+    {(x, y) : x + y*lam = 0 (mod n)} (extended Euclid on n, lam;
+    Guide to Elliptic Curve Cryptography, algorithm 3.74).
+    """
+    root = nroot(n, 2)
+    r0, t0, r1, t1 = n, 0, lam, 1
+    while r1 >= root:
+        q = r0 // r1
+        r0, t0, r1, t1 = r1, t1, r0 - q * r1, t0 - q * t1
+    # r0 is the last remainder >= sqrt(n)
+    q = r1 and r0 // r1
+    r2, t2 = r0 - q * r1, t0 - q * t1
+    a1, b1 = r1, -t1
+    if r0 * r0 + t0 * t0 <= r2 * r2 + t2 * t2:
+        a2, b2 = r0, -t0
+    else:
+        a2, b2 = r2, -t2
+    return a1, b1, a2, b2
+
+
+class Curve:
+    def __init__(self, a, b, p, g=None,
+                                 order=None,
+                                 cofactor=None,
+                                 seed=None):
+        self.a = a
+        self.b = b
+        self.module = p
+
+        self.g = g
+        self.order = order
+        self.cofactor = cofactor
+        self.seed = seed
+        self.points_count = None
+        if self.cofactor == 1 and self.order is not None:
+            self.points_count = self.order
+
+        self._points_count_factors = None
+        self._generator_window = None
+        self._generator_table = None
+        self._glv = None
+        return None
+
+    GENERATOR_WINDOW = 4
+
+    # group interface (see libnum.dlog)
+
+    identity = NULL_POINT
+
+    def op(self, p1, p2):
+        return self.add(p1, p2)
+
+    def inverse(self, p):
+        return self.neg(p)
+
+    def point(self, x, y):
+        """
+        Point object (x, y) bound to the curve, see ecc.Point
+        """
+        from .point import Point
+        return Point(self, x, y)
+
+    def is_null(self, p):
+        """
+        Check if a point is curve's null point
+        """
+        return p == NULL_POINT
+
+    def is_opposite(self, p1, p2):
+        """
+        Check if one point is opposite to another (p1 == -p2)
+        """
+        x1, y1 = p1
+        x2, y2 = p2
+        return (x1 == x2 and y1 == -y2 % self.module)
+
+    def check(self, p):
+        """
+        Check if point is on the curve
+        """
+        x, y = p
+        if self.is_null(p):
+            return True
+        left = (y ** 2) % self.module
+        right = self.right(x)
+        return left == right
+
+    def check_many(self, points):
+        """
+        List of booleans: whether each of @points is on the curve
+        """
+        p, a, b = self.module, self.a, self.b
+        res = []
+        for point in points:
+            x, y = point
+            if x is None and y is None:
+                res.append(True)
+                continue
+            res.append((y * y - (x * x + a) * x - b) % p == 0)
+        return res
+
+    def check_x(self, x):
+        """
+        Check if there is a point on the curve with given @x coordinate
+        (returns list of such points or False)
+        """
+        if x > self.module or x < 0:
+            raise ValueError("Value " + str(x) +
+                             " is not in range [0; <modulus>]")
+        y = self._sqrt_many([self.right(x)])[0]
+        if y is None:
+            return False
+        if y == 0:
+            return [(x, 0)]
+        return [(x, y), (x, self.module - y)]
+
+    def decompress_many(self, xs, parities=None):
+        """
+        Points with given x coordinates (0 <= x < p) and parities of y
+        (0 or 1, all 0 by default), None for x not on the curve
+        or if there is no point with such parity.
+        """
+        p, a, b = self.module, self.a, self.b
+        xs = list(xs)
+        if parities is None:
+            parities = [0] * len(xs)
+        elif len(parities) != len(xs):
+            raise TypeError("xs and parities lists must have same len")
+
+        ys = self._sqrt_many([((x * x + a) * x + b) % p for x in xs])
+        res = []
+        for x, y, parity in zip(xs, ys, parities):
+            if y is not None and (y & 1) != parity:
+                y = p - y if y else None
+            res.append(None if y is None else (x, y))
+        return res
+
+    def _sqrt_many(self, values):
+        """
+        One of square roots of each of @values (reduced modulo prime p),
+        None if there is none.
+        """
+        p = self.module
+        res = []
+        if p & 3 == 3:
+            # root candidate and its check take one exponentiation
+            e = (p + 1) >> 2
+            for v in values:
+                r = pow(v, e, p)
+                res.append(r if (r * r) % p == v else None)
+            return res
+
+        for v in values:
+            try:
+                res.append(sqrtmod_prime(v, p)[0])
+            except ValueError:
+                res.append(None)
+        return res
+
+    def right(self, x):
+        """
+        Right part of the curve equation: x^3 + a*x + b (mod p)
+        """
+        return (x ** 3 + self.a * x + self.b) % self.module
+
+    def find_points_in_range(self, start=0, end=None):
+        """
+        List of points in given range for x coordinate
+        """
+        if end is None:
+            end = self.module - 1
+
+        p = self.module
+        points = []
+        xs = xrange(start, end + 1)
+        for x, y in zip(xs, self._sqrt_many([self.right(x) for x in xs])):
+            if y is None:
+                continue
+            points.append((x, y))
+            if y:
+                points.append((x, p - y))
+        return points
+
+    def iter_points_arrays(self, start=0, end=None, block_size=1 << 16):
+        """
+        Vectorized find_points_in_range for p < 2**32 (requires NumPy):
+        yields (xs, ys) arrays of points for blocks of @block_size x values
+        """
+        from .arrays import iter_points_arrays
+        return iter_points_arrays(self, start, end, block_size)
+
+    def find_points_rand(self, number=1, rng=None):
+        """
+        List of @number random points on the curve
+        Optional arg @rng defines random generator (see get_rng).
+        """
+        rng = get_rng(rng)
+        points = []
+
+        while len(points) < number:
+            x = rng.randint(0, self.module)
+            p = self.check_x(x)
+            if p == False:
+                continue
+            points.append(p)
+
+        return points
+
+    def add(self, p1, p2):
+        """
+        Sum of two points
+        """
+        if self.is_null(p1):
+            return p2
+
+        if self.is_null(p2):
+            return p1
+
+        if self.is_opposite(p1, p2):
+            return NULL_POINT
+
+        x1, y1 = p1
+        x2, y2 = p2
+
+        l = 0
+        if x1 != x2:
+            l = (y2 - y1) * invmod(x2 - x1, self.module)
+        else:
+            l = (3 * x1 ** 2 + self.a) * invmod(2 * y1, self.module)
+
+        x = (l * l - x1 - x2) % self.module
+        y = (l * (x1 - x) - y1) % self.module  # yes, it's that new x
+        return (x, y)
+
+    def neg(self, p):
+        """
+        Opposite point: -P
+        """
+        if self.is_null(p):
+            return p
+        x, y = p
+        return (x, (-y) % self.module)
+
+    def power(self, p, n):
+        """
+        n✕P or (P + P + ... + P) n times
+        """
+        return self._to_affine(self._power_jacobian(p, n))
+
+    def _power_jacobian(self, p, n):
+        """
+        n✕P in Jacobian coordinates, @p is affine
+        """
+        if n == 0 or self.is_null(p):
+            return _JACOBIAN_NULL
+        if n < 0:
+            p, n = self.neg(p), -n
+
+        glv = self._get_glv()
+        # halves of the decomposition are about len(order) / 2 bits long
+        # for any n, so shorter scalars are better without it
+        if (glv is not None and
+                4 * len_in_bits(n) > 3 * len_in_bits(self.order)):
+            # n✕P = k1✕P + k2✕φ(P)
+            k1, k2 = self._glv_decompose(n % self.order)
+            q = ((glv[0] * p[0]) % self.module, p[1])
+            terms = []
+            for k, point in ((k1, p), (k2, q)):
+                if k < 0:
+                    k, point = -k, self.neg(point)
+                if k:
+                    terms.append((k, point))
+            if not terms:
+                return _JACOBIAN_NULL
+            return self._straus(terms)
+
+        # width-w NAF: one inversion for the precomputed odd multiples
+        w = _wnaf_width(len_in_bits(n))
+        return self._jacobian_power(p, n, w)
+
+    # GLV method: for a = 0 and p = 1 (mod 3), φ(x, y) = (βx, y)
+    # with β^3 = 1 (mod p) acts on the subgroup of prime order n
+    # as multiplication by λ, λ^3 = 1 (mod n)
+
+    def set_glv(self, beta=None, lam=None):
+        """
+        Enable GLV method for power: φ(x, y) = (@beta*x, y) must equal
+        @lam✕P for all points P, which is the case for a = 0 and prime
+        order (cofactor 1). Parameters are found if not given.
+        Return (beta, lam) or None if the curve has no such endomorphism.
+        Not enabled by default: power then reduces n modulo the order,
+        which is wrong for points off the curve (invalid curve, twist).
+        """
+        self._glv = (self.order, None)
+        if self.a % self.module or self.order is None:
+            return None
+
+        p, n = self.module, self.order
+        if beta is None or lam is None:
+            if p % 3 != 1 or n % 3 != 1 or self.g is None:
+                return None
+            beta = _cube_root_of_unity(p)
+            lam = _cube_root_of_unity(n)
+            g = self.g
+            # φ(G) is λG or λ^2 G (β is paired with one of them)
+            phi = ((beta * g[0]) % p, g[1])
+            if self.power(g, lam) != phi:
+                lam = (lam * lam) % n
+                if self.power(g, lam) != phi:
+                    return None
+
+        self._glv = (n, (beta, lam) + _glv_basis(n, lam))
+        return beta, lam
+
+    def _get_glv(self):
+        """
+        GLV parameters (beta, lam, a1, b1, a2, b2) or None
+        (set_glv was not called or the order has changed since).
+        """
+        if self._glv is None or self._glv[0] != self.order:
+            return None
+        return self._glv[1]
+
+    def _glv_decompose(self, k):
+        """
+        (k1, k2) : k = k1 + k2*lam (mod order), |k1|, |k2| ~ sqrt(order)
+        """
+        n = self.order
+        beta, lam, a1, b1, a2, b2 = self._glv[1]
+        c1 = _round_div(b2 * k, n)
+        c2 = _round_div(-b1 * k, n)
+        return k - c1 * a1 - c2 * a2, -c1 * b1 - c2 * b2
+
+    def multi_power(self, pairs):
+        """
+        Sum of k✕P over @pairs - iterable of (k, P).
+        Interleaved wNAF (Straus/Shamir's trick) for few terms,
+        Pippenger's bucket method for many terms.
+        """
+        terms = []
+        for k, p in pairs:
+            if k == 0 or self.is_null(p):
+                continue
+            if k < 0:
+                k, p = -k, self.neg(p)
+            terms.append((k, p))
+
+        if not terms:
+            return NULL_POINT
+        if len(terms) == 1:
+            return self.power(terms[0][1], terms[0][0])
+        if len(terms) < _PIPPENGER_THRESHOLD:
+            res = self._straus(terms)
+        else:
+            res = self._pippenger(terms)
+        return self._to_affine(res)
+
+    def _straus(self, terms):
+        """
+        Interleaved wNAF: one chain of doublings shared by all @terms,
+        odd multiples of all points normalized with one inversion.
+        """
+        bits = max(len_in_bits(k) for k, p in terms)
+        w = _wnaf_width(bits)
+        count = 1 << (w - 2)
+
+        jacobian = []
+        for k, p in terms:
+            q = self._to_jacobian(p)
+            jacobian.append(q)
+            if count > 1:
+                double = self._jacobian_double(q)
+                for i in xrange(1, count):
+                    q = self._jacobian_add(q, double)
+                    jacobian.append(q)
+        odd = self._to_affine_many(jacobian)
+        tables = [odd[i * count:(i + 1) * count] for i in xrange(len(terms))]
+        negs = [[self.neg(q) for q in t] for t in tables]
+        digits = [_wnaf(k, w) for k, p in terms]
+
+        res = _JACOBIAN_NULL
+        for i in xrange(bits, -1, -1):
+            res = self._jacobian_double(res)
+            for j, ds in enumerate(digits):
+                if i >= len(ds):
+                    continue
+                d = ds[i]
+                if d > 0:
+                    res = self._jacobian_add_affine(res, tables[j][d >> 1])
+                elif d < 0:
+                    res = self._jacobian_add_affine(res, negs[j][(-d) >> 1])
+        return res
+
+    def _pippenger(self, terms):
+        """
+        Bucket method: scalars are split into signed c-bit digits,
+        for each digit position points are summed into 2**(c-1) buckets,
+        buckets are combined with running sums.
+        About len(k) / c * (len(terms) + 2**c) additions.
+        """
+        n = len(terms)
+        bits = max(len_in_bits(k) for k, p in terms) + 1
+        c = min(xrange(1, 24),
+                key=lambda c: ((bits + c - 1) // c) * (n + (1 << c)))
+
+        mask = (1 << c) - 1
+        half = 1 << (c - 1)
+        windows = (bits + c - 1) // c
+        digits = []
+        for k, p in terms:
+            ds = []
+            for i in xrange(windows):
+                d = k & mask
+                k >>= c
+                if d > half:
+                    d -= 1 << c
+                    k += 1
+                ds.append(d)
+            digits.append(ds)
+        negs = [self.neg(p) for k, p in terms]
+
+        res = _JACOBIAN_NULL
+        for i in xrange(windows - 1, -1, -1):
+            for j in xrange(c):
+                res = self._jacobian_double(res)
+
+            buckets = [_JACOBIAN_NULL] * (half + 1)
+            for j in xrange(n):
+                d = digits[j][i]
+                if d > 0:
+                    buckets[d] = self._jacobian_add_affine(
+                        buckets[d], terms[j][1])
+                elif d < 0:
+                    buckets[-d] = self._jacobian_add_affine(
+                        buckets[-d], negs[j])
+
+            # sum of d * bucket[d] = sum of running sums from the top
+            running = total = _JACOBIAN_NULL
+            for d in xrange(half, 0, -1):
+                running = self._jacobian_add(running, buckets[d])
+                total = self._jacobian_add(total, running)
+            res = self._jacobian_add(res, total)
+        return res
+
+    def _jacobian_power(self, p, n, w):
+        """
+        n✕P in Jacobian coordinates, @p is affine, @n > 0,
+        @w - wNAF width.
+        """
+        digits = _wnaf(n, w)
+        odd = self._odd_multiples(p, 1 << (w - 2))
+        neg = [self.neg(q) for q in odd]
+
+        res = _JACOBIAN_NULL
+        for d in reversed(digits):
+            res = self._jacobian_double(res)
+            if d > 0:
+                res = self._jacobian_add_affine(res, odd[d >> 1])
+            elif d < 0:
+                res = self._jacobian_add_affine(res, neg[(-d) >> 1])
+        return res
+
+    def _odd_multiples(self, p, count):
+        """
+        List [P, 3P, 5P, ...] of @count points in affine coordinates.
+        """
+        if count == 1:
+            return [p]
+        res = [self._to_jacobian(p)]
+        double = self._jacobian_double(res[0])
+        for i in xrange(1, count):
+            res.append(self._jacobian_add(res[-1], double))
+        return self._to_affine_many(res)
+
+    def generate(self, n):
+        """
+        n✕G, uses table of precomputed multiples of G
+        (built on the first call, see build_generator_table)
+        """
+        if self.g is None:
+            raise ValueError("generator is not set")
+        if self.order is not None:
+            n %= self.order
+        elif n < 0:
+            return self.neg(self.generate(-n))
+
+        if self._generator_table is None:
+            self.build_generator_table()
+
+        w = self._generator_window
+        table = self._generator_table
+        if n >> (w * len(table)):
+            # out of the table (order is unknown)
+            return self.power(self.g, n)
+
+        mask = (1 << w) - 1
+        res = _JACOBIAN_NULL
+        i = 0
+        while n:
+            d = n & mask
+            if d:
+                res = self._jacobian_add_affine(res, table[i][d - 1])
+            n >>= w
+            i += 1
+        return self._to_affine(res)
+
+    def build_generator_table(self, window=None):
+        """
+        Precompute multiples of G for generate():
+        row i is [j * 2**(i*window) * G for j in 1..2**window-1].
+        Table has about len(order) / window * 2**window points,
+        generate() then takes len(order) / window additions and no doublings.
+        """
+        if self.g is None:
+            raise ValueError("generator is not set")
+        if window is None:
+            window = self.GENERATOR_WINDOW
+        if window < 1:
+            raise ValueError("window must be positive: %s" % window)
+
+        if self.order is not None:
+            bits = len_in_bits(self.order)
+        else:
+            # points count <= p + 1 + 2 sqrt(p) < 2p
+            bits = len_in_bits(self.module) + 1
+
+        rows = (bits + window - 1) // window
+        size = (1 << window) - 1
+        points = []
+        base = self._to_jacobian(self.g)
+        for i in xrange(rows):
+            acc = base
+            points.append(acc)
+            for j in xrange(1, size):
+                acc = self._jacobian_add(acc, base)
+                points.append(acc)
+            base = self._jacobian_add(acc, base)  # 2**window * base
+
+        points = self._to_affine_many(points)
+        self._generator_window = window
+        self._generator_table = [points[i * size:(i + 1) * size]
+                                 for i in xrange(rows)]
+
+    def generator_table_to_json(self):
+        """
+        Serialize table built by build_generator_table.
+        """
+        if self._generator_table is None:
+            self.build_generator_table()
+        return json.dumps({"window": self._generator_window,
+                           "g": self.g,
+                           "table": self._generator_table})
+
+    def load_generator_table_json(self, j):
+        """
+        Load table serialized by generator_table_to_json.
+        """
+        data = json.loads(j)
+        if tuple(data["g"]) != tuple(self.g):
+            raise ValueError("table is built for another generator")
+        window = data["window"]
+        table = [[tuple(p) for p in row] for row in data["table"]]
+        if any(len(row) != (1 << window) - 1 for row in table):
+            raise ValueError("malformed table")
+        self._generator_window = window
+        self._generator_table = table
+
+    # Jacobian coordinates: (X, Y, Z) is (X / Z**2, Y / Z**3),
+    # Z == 0 for the null point
+
+    def _to_jacobian(self, p):
+        if self.is_null(p):
+            return _JACOBIAN_NULL
+        x, y = p
+        return (x, y, 1)
+
+    def _to_affine(self, p):
+        X, Y, Z = p
+        if Z == 0:
+            return NULL_POINT
+        m = self.module
+        zi = invmod(Z, m)
+        zi2 = (zi * zi) % m
+        return ((X * zi2) % m, (Y * zi2 * zi) % m)
+
+    def _to_affine_many(self, points):
+        """
+        Convert list of Jacobian points to affine using one inversion.
+        """
+        m = self.module
+        prefix = []
+        acc = 1
+        for X, Y, Z in points:
+            if Z:
+                acc = (acc * Z) % m
+            prefix.append(acc)
+        inv = invmod(acc, m)
+
+        res = [None] * len(points)
+        for i in xrange(len(points) - 1, -1, -1):
+            X, Y, Z = points[i]
+            if Z == 0:
+                res[i] = NULL_POINT
+                continue
+            zi = (inv * prefix[i - 1]) % m if i else inv
+            inv = (inv * Z) % m
+            zi2 = (zi * zi) % m
+            res[i] = ((X * zi2) % m, (Y * zi2 * zi) % m)
+        return res
+
+    def _reduce(self, t):
+        """
+        t mod p for products in Jacobian formulas, hook for special
+        moduli (see curves._MersenneCurve).
+        """
+        return t % self.module
+
+    def _jacobian_double(self, p):
+        X, Y, Z = p
+        if Z == 0 or Y == 0:
+            return _JACOBIAN_NULL
+        red = self._reduce
+        XX = red(X * X)
+        YY = red(Y * Y)
+        YYYY = red(YY * YY)
+        S = red(4 * X * YY)
+        M = 3 * XX
+        if self.a:
+            ZZ = red(Z * Z)
+            M += self.a * red(ZZ * ZZ)
+        M %= self.module
+        X3 = red(M * M - 2 * S)
+        Y3 = red(M * (S - X3) - 8 * YYYY)
+        Z3 = red(2 * Y * Z)
+        return (X3, Y3, Z3)
+
+    def _jacobian_add_affine(self, p, q):
+        """
+        Mixed addition: @p in Jacobian, @q in affine coordinates.
+        """
+        if self.is_null(q):
+            return p
+        X1, Y1, Z1 = p
+        x2, y2 = q
+        if Z1 == 0:
+            return (x2, y2, 1)
+        m = self.module
+        red = self._reduce
+        Z1Z1 = red(Z1 * Z1)
+        U2 = red(x2 * Z1Z1)
+        S2 = red(y2 * red(Z1 * Z1Z1))
+        H = (U2 - X1) % m
+        r = (S2 - Y1) % m
+        if H == 0:
+            if r == 0:
+                return self._jacobian_double(p)
+            return _JACOBIAN_NULL
+        HH = red(H * H)
+        HHH = red(H * HH)
+        V = red(X1 * HH)
+        X3 = red(r * r - HHH - 2 * V)
+        Y3 = red(r * (V - X3) - Y1 * HHH)
+        Z3 = red(Z1 * H)
+        return (X3, Y3, Z3)
+
+    def _jacobian_add(self, p, q):
+        """
+        Addition of two points in Jacobian coordinates.
+        """
+        X1, Y1, Z1 = p
+        X2, Y2, Z2 = q
+        if Z1 == 0:
+            return q
+        if Z2 == 0:
+            return p
+        m = self.module
+        red = self._reduce
+        Z1Z1 = red(Z1 * Z1)
+        Z2Z2 = red(Z2 * Z2)
+        U1 = red(X1 * Z2Z2)
+        U2 = red(X2 * Z1Z1)
+        S1 = red(Y1 * red(Z2 * Z2Z2))
+        S2 = red(Y2 * red(Z1 * Z1Z1))
+        H = (U2 - U1) % m
+        r = (S2 - S1) % m
+        if H == 0:
+            if r == 0:
+                return self._jacobian_double(p)
+            return _JACOBIAN_NULL
+        HH = red(H * H)
+        HHH = red(H * HH)
+        V = red(U1 * HH)
+        X3 = red(r * r - HHH - 2 * V)
+        Y3 = red(r * (V - X3) - S1 * HHH)
+        Z3 = red(H * red(Z1 * Z2))
+        return (X3, Y3, Z3)
+
+    def count_points(self, rng=None):
+        """
+        Number of points on the curve (including null point),
+        modulus must be prime. The result is stored as .points_count
+        (see libnum.ecc.count for methods).
+        """
+        if self.points_count is None:
+            from .count import count_points
+            self.points_count = count_points(self.a, self.b, self.module, rng)
+        return self.points_count
+
+    def point_order(self, p):
+        """
+        Order of point @p: prime factors of the points count
+        are removed while the multiple is still null.
+        """
+        from ..dlog import element_order
+        if self._points_count_factors is None:
+            from ..factorize import factorize
+            self._points_count_factors = factorize(self.count_points())
+        return element_order(p, self.count_points(), self,
+                             self._points_count_factors)
+
+    def get_order(self, p, limit=None):
+        """
+        Order of @p, returns None if it is not less than @limit.
+        Uses point_order if the points count is known (or @limit is not
+        given and the modulus is prime), otherwise baby-step giant-step
+        bounded by @limit: O(sqrt(@limit)) additions, any modulus.
+        """
+        if self.is_null(p):
+            return 1
+        if (self.points_count is not None or
+                (limit is None and prime_test(self.module))):
+            order = self.point_order(p)
+            if limit is not None and order >= limit:
+                return None
+            return order
+        if limit is None:
+            order = 1
+            res = p
+            while not self.is_null(res):
+                res = self.add(res, p)
+                order += 1
+            return order
+        return self._bounded_order(p, limit)
+
+    def _bounded_order(self, p, limit):
+        """
+        Least n < @limit : n✕P = O, None if there is none.
+        Baby steps j✕P (0 < j < m), giant steps i*m✕P: the first
+        match i*m✕P = j✕P (j = 0 for the null point) gives n = i*m - j.
+        """
+        m = nroot(limit - 1, 2) + 1
+        table = {}
+        cur = p
+        for j in xrange(1, m):
+            if self.is_null(cur):
+                return j if j < limit else None
+            table[cur] = j
+            cur = self.add(cur, p)
+
+        step = self.power(p, m)
+        giant = step
+        for i in xrange(1, m + 1):
+            j = 0 if self.is_null(giant) else table.get(giant)
+            if j is not None:
+                order = i * m - j
+                return order if order < limit else None
+            if i * m + 1 >= limit:
+                break
+            giant = self.add(giant, step)
+        return None
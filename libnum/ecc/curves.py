@@ -0,0 +1,157 @@
+#-*- coding:utf-8 -*-
+
+"""
+Registry of standard curves: get_curve("P-256"), get_curve("secp256k1")...
+Curves are created on the first request and shared afterwards,
+so the table of multiples of G (see Curve.generate) is built once;
+with @cache_dir it is also stored on disk and loaded on the next run.
+"""
+
+import os
+
+from ..common import len_in_bits
+from .curve import Curve
+from .montgomery import MontgomeryCurve
+from .edwards import EdwardsCurve
+
+__all__ = ('CURVE_NAMES', 'get_curve')
+
+
+class _MersenneCurve(Curve):
+    """
+    Curve over field of Mersenne prime size p = 2**k - 1 (P-521):
+    x mod p is computed as (x & p) + (x >> k) before the (then cheap)
+    final reduction; scalar multiplication is about 2x faster than with %.
+    """
+
+    def __init__(self, *args, **kwargs):
+        Curve.__init__(self, *args, **kwargs)
+        self._bits = len_in_bits(self.module)
+        if self.module != (1 << self._bits) - 1:
+            raise ValueError("modulus is not a Mersenne number")
+
+    def _reduce(self, t):
+        m = self.module
+        return ((t & m) + (t >> self._bits)) % m
+
+
+_P25519 = 2 ** 255 - 19
+_L25519 = 2 ** 252 + 27742317777372353535851937790883648493
+
+# name: (class, args: curve parameters, generator, order, cofactor)
+_PARAMS = {
+    "P-256": (Curve, (
+        -3,
+        0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b,
+        2 ** 256 - 2 ** 224 + 2 ** 192 + 2 ** 96 - 1,
+        (0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+         0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5),
+        0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551,
+        1)),
+    "P-384": (Curve, (
+        -3,
+        int("b3312fa7e23ee7e4988e056be3f82d19181d9c6efe8141120314088f"
+            "5013875ac656398d8a2ed19d2a85c8edd3ec2aef", 16),
+        2 ** 384 - 2 ** 128 - 2 ** 96 + 2 ** 32 - 1,
+        (int("aa87ca22be8b05378eb1c71ef320ad746e1d3b628ba79b9859f741e0"
+             "82542a385502f25dbf55296c3a545e3872760ab7", 16),
+         int("3617de4a96262c6f5d9e98bf9292dc29f8f41dbd289a147ce9da3113"
+             "b5f0b8c00a60b1ce1d7e819d7a431d7c90ea0e5f", 16)),
+        int("ffffffffffffffffffffffffffffffffffffffffffffffffc7634d81"
+            "f4372ddf581a0db248b0a77aecec196accc52973", 16),
+        1)),
+    "P-521": (_MersenneCurve, (
+        -3,
+        int("0051953eb9618e1c9a1f929a21a0b68540eea2da725b99b315f3b8b4"
+            "89918ef109e156193951ec7e937b1652c0bd3bb1bf073573df883d2c"
+            "34f1ef451fd46b503f00", 16),
+        2 ** 521 - 1,
+        (int("00c6858e06b70404e9cd9e3ecb662395b4429c648139053fb521f828"
+             "af606b4d3dbaa14b5e77efe75928fe1dc127a2ffa8de3348b3c1856a"
+             "429bf97e7e31c2e5bd66", 16),
+         int("011839296a789a3bc0045c8a5fb42c7d1bd998f54449579b446817af"
+             "bd17273e662c97ee72995ef42640c550b9013fad0761353c7086a272"
+             "c24088be94769fd16650", 16)),
+        int("01ffffffffffffffffffffffffffffffffffffffffffffffffffffff"
+            "fffffffffffa51868783bf2f966b7fcc0148f709a5d03bb5c9b8899c"
+            "47aebb6fb71e91386409", 16),
+        1)),
+    "secp256k1": (Curve, (
+        0,
+        7,
+        2 ** 256 - 2 ** 32 - 977,
+        (0x79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798,
+         0x483ada7726a3c4655da4fbfc0e1108a8fd17b448a68554199c47d08ffb10d4b8),
+        0xfffffffffffffffffffffffffffffffebaaedce6af48a03bbfd25e8cd0364141,
+        1)),
+    "Curve25519": (MontgomeryCurve, (
+        486662,
+        1,
+        _P25519,
+        (9, int("1478161944758954479102059356840998688726460613461647528896"
+                "4881837755586237401")),
+        _L25519,
+        8)),
+    "Ed25519": (EdwardsCurve, (
+        -1,
+        -121665 * pow(121666, _P25519 - 2, _P25519),
+        _P25519,
+        (int("1511222134953540077250115140958853151145401269304185720604"
+             "6113283949847762202"),
+         int("4631683569492647816942839400347516314130799386625622561578"
+             "3033603165251855960")),
+        _L25519,
+        8)),
+}
+
+_ALIASES = {
+    "secp256r1": "P-256",
+    "prime256v1": "P-256",
+    "secp384r1": "P-384",
+    "secp521r1": "P-521",
+    "X25519": "Curve25519",
+}
+
+CURVE_NAMES = tuple(sorted(_PARAMS))
+
+_CURVES = {}
+
+
+def get_curve(name, cache_dir=None):
+    """
+    Standard curve by @name (one of CURVE_NAMES or an alias like
+    "secp256r1"): Curve, MontgomeryCurve (Curve25519) or EdwardsCurve
+    (Ed25519). The same object is returned on each call.
+    If @cache_dir is given, table for Curve.generate is loaded from
+    (or built and saved to) a file in this directory.
+    """
+    name = _ALIASES.get(name, name)
+    if name not in _PARAMS:
+        raise ValueError("unknown curve: %s" % name)
+
+    curve = _CURVES.get(name)
+    if curve is None:
+        cls, args = _PARAMS[name]
+        curve = _CURVES[name] = cls(*args)
+
+    if cache_dir is not None and isinstance(curve, Curve):
+        _load_generator_table(curve, os.path.join(cache_dir, name + ".json"))
+    return curve
+
+
+def _load_generator_table(curve, path):
+    if curve._generator_table is not None:
+        return
+    try:
+        with open(path) as f:
+            curve.load_generator_table_json(f.read())
+        if curve._generator_window == curve.GENERATOR_WINDOW:
+            return
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        pass
+
+    curve.build_generator_table()
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "w") as f:
+        f.write(curve.generator_table_to_json())
+    os.rename(tmp, path)
@@ -0,0 +1,211 @@
+#-*- coding:utf-8 -*-
+
+from ..compat import xrange
+from ..common import len_in_bits
+from ..modular import invmod
+from .curve import NULL_POINT, _wnaf, _wnaf_width
+from .montgomery import MontgomeryCurve
+
+__all__ = ('EdwardsCurve',)
+
+
+class EdwardsCurve(object):
+    """
+    Twisted Edwards curve a*x^2 + y^2 = 1 + d*x^2*y^2 (mod p).
+    Neutral element is (0, 1). Arithmetic uses unified formulas
+    in extended coordinates (X, Y, Z, T): x = X/Z, y = Y/Z, T = XY/Z;
+    addition is complete (no special cases) if a is a square and d is not.
+    Maps to/from Montgomery and short Weierstrass forms are provided.
+    """
+
+    def __init__(self, a, d, p, g=None, order=None, cofactor=None):
+        if (a * d * (a - d)) % p == 0:
+            raise ValueError("curve is singular")
+        self.a = a % p
+        self.d = d % p
+        self.module = p
+        self.g = g
+        self.order = order
+        self.cofactor = cofactor
+        # (parameters, curve) of to_montgomery / to_weierstrass
+        self._montgomery = None
+        self._weierstrass = None
+
+    # group interface (see libnum.dlog)
+
+    identity = (0, 1)
+
+    def op(self, p1, p2):
+        return self.add(p1, p2)
+
+    def inverse(self, p):
+        return self.neg(p)
+
+    def is_null(self, p):
+        return p == (0, 1)
+
+    def check(self, p):
+        """
+        Check if point is on the curve
+        """
+        x, y = p
+        xx, yy = x * x, y * y
+        return (self.a * xx + yy - 1 - self.d * xx * yy) % self.module == 0
+
+    def neg(self, p):
+        x, y = p
+        return ((-x) % self.module, y)
+
+    def add(self, p1, p2):
+        """
+        Sum of two points
+        """
+        return self._to_affine(self._add(self._to_extended(p1),
+                                         self._to_extended(p2)))
+
+    def power(self, p, n):
+        """
+        n✕P (wNAF in extended coordinates)
+        """
+        if n == 0:
+            return (0, 1)
+        if n < 0:
+            p, n = self.neg(p), -n
+
+        w = _wnaf_width(len_in_bits(n))
+        P = self._to_extended(p)
+        odd = [P]
+        if w > 2:
+            double = self._double(P)
+            for i in xrange(1, 1 << (w - 2)):
+                odd.append(self._add(odd[-1], double))
+        m = self.module
+        neg = [((-X) % m, Y, Z, (-T) % m) for X, Y, Z, T in odd]
+
+        res = (0, 1, 1, 0)
+        for d in reversed(_wnaf(n, w)):
+            res = self._double(res)
+            if d > 0:
+                res = self._add(res, odd[d >> 1])
+            elif d < 0:
+                res = self._add(res, neg[(-d) >> 1])
+        return self._to_affine(res)
+
+    def _to_extended(self, p):
+        x, y = p
+        return (x, y, 1, (x * y) % self.module)
+
+    def _to_affine(self, p):
+        X, Y, Z, T = p
+        m = self.module
+        zi = invmod(Z, m)
+        return ((X * zi) % m, (Y * zi) % m)
+
+    def _add(self, p1, p2):
+        # add-2008-hwcd (Hisil, Wong, Carter, Dawson)
+        X1, Y1, Z1, T1 = p1
+        X2, Y2, Z2, T2 = p2
+        m = self.module
+        A = (X1 * X2) % m
+        B = (Y1 * Y2) % m
+        C = (T1 * self.d * T2) % m
+        D = (Z1 * Z2) % m
+        E = ((X1 + Y1) * (X2 + Y2) - A - B) % m
+        F = D - C
+        G = D + C
+        H = B - self.a * A
+        return ((E * F) % m, (G * H) % m, (F * G) % m, (E * H) % m)
+
+    def _double(self, p):
+        # dbl-2008-hwcd, T is not used
+        X1, Y1, Z1, T1 = p
+        m = self.module
+        A = (X1 * X1) % m
+        B = (Y1 * Y1) % m
+        C = (2 * Z1 * Z1) % m
+        D = self.a * A
+        E = ((X1 + Y1) ** 2 - A - B) % m
+        G = D + B
+        F = G - C
+        H = D - B
+        return ((E * F) % m, (G * H) % m, (F * G) % m, (E * H) % m)
+
+    # Montgomery form: A = 2(a + d) / (a - d), B = 4 / (a - d),
+    # (x, y) -> ((1 + y) / (1 - y), (1 + y) / ((1 - y) x))
+
+    def to_montgomery(self):
+        """
+        Birationally equivalent MontgomeryCurve (with mapped generator),
+        cached while the parameters are unchanged.
+        """
+        key = self._params()
+        if self._montgomery is None or self._montgomery[0] != key:
+            p = self.module
+            i = invmod(self.a - self.d, p)
+            g = self.g
+            if g is not None:
+                g = self.point_to_montgomery(g)
+            mc = MontgomeryCurve((2 * (self.a + self.d) * i) % p, (4 * i) % p,
+                                 p, g, self.order, self.cofactor)
+            self._montgomery = (key, mc)
+        return self._montgomery[1]
+
+    def _params(self):
+        return (self.a, self.d, self.module, self.g, self.order,
+                self.cofactor)
+
+    @classmethod
+    def from_montgomery(cls, curve):
+        """
+        Twisted Edwards form of MontgomeryCurve @curve:
+        a = (A + 2) / B, d = (A - 2) / B; the map is point_from_montgomery.
+        """
+        p = curve.module
+        i = invmod(curve.B, p)
+        res = cls(((curve.A + 2) * i) % p, ((curve.A - 2) * i) % p, p,
+                  order=curve.order, cofactor=curve.cofactor)
+        if curve.g is not None:
+            res.g = res.point_from_montgomery(curve.g)
+        return res
+
+    def point_to_montgomery(self, P):
+        p = self.module
+        x, y = P
+        if x == 0:
+            # (0, 1) is neutral, (0, -1) has order 2
+            return NULL_POINT if y == 1 else (0, 0)
+        u = ((1 + y) * invmod(1 - y, p)) % p
+        return (u, (u * invmod(x, p)) % p)
+
+    def point_from_montgomery(self, P):
+        """
+        Raise ValueError for points mapped to infinity
+        (don't exist if d is not a square).
+        """
+        p = self.module
+        if P == NULL_POINT:
+            return (0, 1)
+        u, v = P
+        if u == 0:
+            return (0, p - 1)
+        if v == 0 or (u + 1) % p == 0:
+            raise ValueError("point is mapped to infinity")
+        return ((u * invmod(v, p)) % p, ((u - 1) * invmod(u + 1, p)) % p)
+
+    def to_weierstrass(self):
+        """
+        Birationally equivalent Curve (short Weierstrass form),
+        cached while the parameters are unchanged.
+        """
+        key = self._params()
+        if self._weierstrass is None or self._weierstrass[0] != key:
+            self._weierstrass = (key, self.to_montgomery().to_weierstrass())
+        return self._weierstrass[1]
+
+    def point_to_weierstrass(self, P):
+        mc = self.to_montgomery()
+        return mc.point_to_weierstrass(self.point_to_montgomery(P))
+
+    def point_from_weierstrass(self, P):
+        mc = self.to_montgomery()
+        return self.point_from_montgomery(mc.point_from_weierstrass(P))
@@ -0,0 +1,377 @@
+#-*- coding:utf-8 -*-
+
+"""
+Finite fields F_{p^k} = F_p[x] / (f) in polynomial basis.
+Elements are FieldElement objects with usual arithmetic operators;
+elements of F_p are stored as constants, so mixed operations
+(e.g. with points of a curve over F_p) cost O(k).
+"""
+
+import numbers
+
+from ..compat import xrange
+from ..common import get_rng
+from ..primes import prime_test
+from .poly import (_ZeroDivisor, _PolyRing, _poly_trim,
+                   _poly_is_irreducible)
+
+__all__ = ('ExtensionField', 'FieldElement')
+
+
+# schoolbook multiplication below this length
+_KARATSUBA_THRESHOLD = 16
+
+
+def _schoolbook(a, b):
+    res = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                res[i + j] += x * y
+    return res
+
+
+def _karatsuba(a, b):
+    """
+    Product of coefficient lists (not reduced modulo p):
+    three half-size products instead of four.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if len(b) < _KARATSUBA_THRESHOLD:
+        return _schoolbook(a, b)
+
+    m = len(a) >> 1
+    a0, a1 = a[:m], a[m:]
+    b0, b1 = b[:m], b[m:]
+    z0 = _karatsuba(a0, b0)
+    z2 = _karatsuba(a1, b1) if b1 else []
+    s = [x + y for x, y in zip(a0, a1)] + a1[len(a0):]
+    t = b1 + [0] * (len(b0) - len(b1))
+    t = [x + y for x, y in zip(b0, t)] + b1[len(b0):]
+    z1 = _karatsuba(s, t)
+
+    res = [0] * (len(a) + len(b) - 1)
+    for i, c in enumerate(z0):
+        res[i] += c
+        z1[i] -= c
+    for i, c in enumerate(z2):
+        res[i + 2 * m] += c
+        z1[i] -= c
+    for i, c in enumerate(z1):
+        if i + m < len(res):
+            res[i + m] += c
+    return res
+
+
+class ExtensionField(object):
+    """
+    Field F_{p^k}: @p is a prime, @modulus is a monic irreducible
+    polynomial of degree k (coefficients, lowest first).
+    If only @k is given, sparse x^k + c or x^k + x + c is searched for
+    (random polynomial as a last resort).
+    Call the field to make elements: F(3), F([1, 2]) = 1 + 2x.
+    """
+
+    def __init__(self, p, k=None, modulus=None, rng=None):
+        if not prime_test(p):
+            raise ValueError("characteristic must be prime: %s" % p)
+        if modulus is None:
+            if k is None or k < 1:
+                raise ValueError("degree or modulus is needed")
+            modulus = _find_irreducible(p, k, rng)
+        else:
+            modulus = _poly_trim([c % p for c in modulus])
+            if not modulus or modulus[-1] != 1:
+                raise ValueError("modulus must be monic")
+            if k is not None and k != len(modulus) - 1:
+                raise ValueError("modulus degree is not %s" % k)
+            if not _poly_is_irreducible(modulus, p):
+                raise ValueError("modulus is reducible")
+
+        self.p = p
+        self.k = len(modulus) - 1
+        self.modulus = modulus
+        self.order = p ** self.k
+        # x^k = -(lower terms): nonzero (i, -f_i)
+        self._tail = [(i, (-c) % p) for i, c in enumerate(modulus[:-1]) if c]
+        self._ring = _PolyRing(modulus, p)
+        self._frobenius = None
+
+        self.zero = FieldElement(self, ())
+        self.one = FieldElement(self, (1,))
+        self.gen = self([0, 1])
+
+    def __repr__(self):
+        return "ExtensionField(%d, modulus=%r)" % (self.p, self.modulus)
+
+    def __eq__(self, other):
+        return (isinstance(other, ExtensionField) and
+                self.p == other.p and self.modulus == other.modulus)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.p, tuple(self.modulus)))
+
+    def __call__(self, value):
+        if isinstance(value, FieldElement):
+            if value.field != self:
+                raise ValueError("element of another field")
+            return value
+        if isinstance(value, numbers.Integral):
+            value = [value]
+        value = [c % self.p for c in value]
+        if len(value) > self.k:
+            value = self._reduce(value)
+        return FieldElement(self, tuple(_poly_trim(value)))
+
+    def random(self, rng=None):
+        rng = get_rng(rng)
+        return self([rng.randint(0, self.p - 1) for i in xrange(self.k)])
+
+    # group interface (multiplicative group, see libnum.dlog)
+
+    @property
+    def identity(self):
+        return self.one
+
+    def op(self, a, b):
+        return a * b
+
+    def inverse(self, a):
+        return a.inverse()
+
+    def power(self, a, e):
+        return a ** e
+
+    def _reduce(self, c):
+        """
+        Reduce list of integers (any size) modulo p and the modulus
+        """
+        p = self.p
+        k = self.k
+        tail = self._tail
+        for i in xrange(len(c) - 1, k - 1, -1):
+            t = c[i] % p
+            if t:
+                base = i - k
+                for j, fj in tail:
+                    c[base + j] += t * fj
+        return _poly_trim([x % p for x in c[:k]])
+
+    def _frobenius_table(self):
+        """
+        Rows x^(i*p) mod f, i < k
+        """
+        if self._frobenius is None:
+            xp = self._ring.pow([0, 1], self.p)
+            rows = [[1]]
+            for i in xrange(1, self.k):
+                rows.append(self._ring.mul(rows[-1], xp))
+            self._frobenius = rows
+        return self._frobenius
+
+
+class FieldElement(object):
+    """
+    Element of ExtensionField, immutable.
+    .c - tuple of coefficients (lowest first, no trailing zeros).
+    """
+
+    __slots__ = ('field', 'c')
+
+    def __init__(self, field, c):
+        self.field = field
+        self.c = c
+
+    def _coerce(self, other):
+        if isinstance(other, FieldElement):
+            if other.field is not self.field and other.field != self.field:
+                raise ValueError("elements of different fields")
+            return other.c
+        if isinstance(other, numbers.Integral):
+            other %= self.field.p
+            return (other,) if other else ()
+        return None
+
+    def __repr__(self):
+        return "FieldElement(%r)" % (list(self.c),)
+
+    def __eq__(self, other):
+        if isinstance(other, FieldElement) and other.field != self.field:
+            return False
+        c = self._coerce(other)
+        if c is None:
+            return NotImplemented
+        return self.c == c
+
+    def __ne__(self, other):
+        res = self.__eq__(other)
+        if res is NotImplemented:
+            return res
+        return not res
+
+    def __hash__(self):
+        if len(self.c) <= 1:
+            # equal to an integer
+            return hash(self.c[0] if self.c else 0)
+        return hash(self.c)
+
+    def __bool__(self):
+        return bool(self.c)
+
+    __nonzero__ = __bool__
+
+    def is_constant(self):
+        """
+        Check if element is in F_p
+        """
+        return len(self.c) <= 1
+
+    def __int__(self):
+        if len(self.c) > 1:
+            raise ValueError("element is not in the prime field")
+        return self.c[0] if self.c else 0
+
+    def __add__(self, other):
+        c = self._coerce(other)
+        if c is None:
+            return NotImplemented
+        a = self.c
+        if len(a) < len(c):
+            a, c = c, a
+        p = self.field.p
+        res = list(a)
+        for i, x in enumerate(c):
+            res[i] = (res[i] + x) % p
+        return FieldElement(self.field, tuple(_poly_trim(res)))
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        p = self.field.p
+        return FieldElement(self.field, tuple((-x) % p for x in self.c))
+
+    def __sub__(self, other):
+        c = self._coerce(other)
+        if c is None:
+            return NotImplemented
+        p = self.field.p
+        res = list(self.c) + [0] * (len(c) - len(self.c))
+        for i, x in enumerate(c):
+            res[i] = (res[i] - x) % p
+        return FieldElement(self.field, tuple(_poly_trim(res)))
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        c = self._coerce(other)
+        if c is None:
+            return NotImplemented
+        a = self.c
+        field = self.field
+        p = field.p
+        if not a or not c:
+            return field.zero
+        if len(a) == 1 or len(c) == 1:
+            t, h = (a[0], c) if len(a) == 1 else (c[0], a)
+            return FieldElement(field, tuple(_poly_trim([(t * x) % p
+                                                         for x in h])))
+        res = _karatsuba(list(a), list(c))
+        if len(res) > field.k:
+            return FieldElement(field, tuple(field._reduce(res)))
+        return FieldElement(field, tuple(_poly_trim([x % p for x in res])))
+
+    __rmul__ = __mul__
+
+    def inverse(self):
+        """
+        Multiplicative inverse (extended Euclid),
+        ValueError for zero.
+        """
+        field = self.field
+        if not self.c:
+            raise ValueError("zero has no inverse")
+        if len(self.c) == 1:
+            return FieldElement(field, (pow(self.c[0], field.p - 2, field.p),))
+        try:
+            res = field._ring.inv(list(self.c))
+        except _ZeroDivisor:
+            raise ValueError("element is not invertible")
+        return FieldElement(field, tuple(res))
+
+    def __truediv__(self, other):
+        c = self._coerce(other)
+        if c is None:
+            return NotImplemented
+        return self * FieldElement(self.field, c).inverse()
+
+    def __rtruediv__(self, other):
+        return self.inverse() * other
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __pow__(self, e):
+        if not isinstance(e, numbers.Integral):
+            return NotImplemented
+        if e < 0:
+            return self.inverse() ** (-e)
+        field = self.field
+        if len(self.c) <= 1:
+            t = pow(self.c[0], e, field.p) if self.c else int(e == 0)
+            return FieldElement(field, (t,) if t else ())
+        e %= field.order - 1
+        res = field.one
+        for bit in bin(e)[2:]:
+            res = res * res
+            if bit == "1":
+                res = res * self
+        return res
+
+    def frobenius(self, i=1):
+        """
+        a^(p^i), linear map: coefficients are fixed,
+        x^j is replaced by precomputed x^(j*p)
+        """
+        field = self.field
+        i %= field.k
+        if not i or len(self.c) <= 1:
+            return self
+        rows = field._frobenius_table()
+        p = field.p
+        res = self.c
+        for t in xrange(i):
+            acc = [0] * field.k
+            for j, a in enumerate(res):
+                if a:
+                    for l, r in enumerate(rows[j]):
+                        acc[l] += a * r
+            res = tuple(_poly_trim([x % p for x in acc]))
+        return FieldElement(field, res)
+
+
+def _find_irreducible(p, k, rng=None):
+    """
+    Monic irreducible polynomial of degree @k over F_p:
+    x^k - c, x^k + x + c with small c first (cheap reduction),
+    random otherwise.
+    """
+    if k == 1:
+        return [0, 1]
+    for c in xrange(1, min(p, 64)):
+        f = [(-c) % p] + [0] * (k - 1) + [1]
+        if _poly_is_irreducible(f, p):
+            return f
+    for c in xrange(1, min(p, 64)):
+        f = [c % p, 1] + [0] * (k - 2) + [1]
+        if _poly_is_irreducible(f, p):
+            return f
+    rng = get_rng(rng)
+    while True:
+        f = [rng.randint(0, p - 1) for i in xrange(k)] + [1]
+        if _poly_is_irreducible(f, p):
+            return f
@@ -0,0 +1,151 @@
+#-*- coding:utf-8 -*-
+
+from ..compat import xrange
+from ..common import get_rng, len_in_bits
+from ..modular import invmod
+from ..sqrtmod import jacobi, sqrtmod_prime
+from .curve import NULL_POINT, Curve
+from .poly import _poly_roots
+
+__all__ = ('MontgomeryCurve',)
+
+
+class MontgomeryCurve(object):
+    """
+    Montgomery curve B*y^2 = x^3 + A*x^2 + x (mod p):
+    x-only scalar multiplication (Montgomery ladder) and maps
+    to/from short Weierstrass form (Curve).
+    Null point is NULL_POINT.
+    """
+
+    def __init__(self, A, B, p, g=None, order=None, cofactor=None):
+        if (B * (A * A - 4)) % p == 0:
+            raise ValueError("curve is singular")
+        self.A = A % p
+        self.B = B % p
+        self.module = p
+        self.g = g
+        self.order = order
+        self.cofactor = cofactor
+        self._a24 = ((A + 2) * invmod(4, p)) % p
+
+    def check(self, p):
+        """
+        Check if point is on the curve
+        """
+        if p == NULL_POINT:
+            return True
+        x, y = p
+        return (self.B * y * y - ((x + self.A) * x + 1) * x) % self.module == 0
+
+    def ladder(self, x, k, bits=None):
+        """
+        x coordinate of k✕P (integer), None if k✕P is the null point
+        (x-only form, not NULL_POINT). @x is an integer: x coordinate
+        of P, which must not be the null point. See ladder_xz.
+        """
+        X, Z = self.ladder_xz(x, k, bits)
+        if Z == 0:
+            return None
+        return (X * invmod(Z, self.module)) % self.module
+
+    def ladder_xz(self, x, k, bits=None):
+        """
+        Montgomery ladder: (X, Z) with X / Z = x coordinate of k✕P
+        (Z = 0 for null point), @x is x coordinate of P.
+        The same sequence of operations is done for any 0 <= @k < 2**@bits
+        (@bits defaults to length of the modulus), key bits select
+        operands by masking instead of branching.
+        No inversions: modulus needn't be prime (e.g. ECM stage 1).
+        """
+        p = self.module
+        if bits is None:
+            bits = len_in_bits(p)
+        if k < 0 or k >> bits:
+            raise ValueError("scalar must be in [0, 2**bits): %s" % k)
+
+        x %= p
+        a24 = self._a24
+        X2, Z2, X3, Z3 = 1, 0, x, 1
+        swap = 0
+        for i in xrange(bits - 1, -1, -1):
+            bit = (k >> i) & 1
+            mask = -(swap ^ bit)
+            swap = bit
+            t = mask & (X2 ^ X3)
+            X2 ^= t
+            X3 ^= t
+            t = mask & (Z2 ^ Z3)
+            Z2 ^= t
+            Z3 ^= t
+
+            # (X2, Z2) = 2 * (X2, Z2), (X3, Z3) = (X2, Z2) + (X3, Z3)
+            A = X2 + Z2
+            AA = (A * A) % p
+            B = X2 - Z2
+            BB = (B * B) % p
+            E = AA - BB
+            DA = ((X3 - Z3) * A) % p
+            CB = ((X3 + Z3) * B) % p
+            X3 = ((DA + CB) ** 2) % p
+            Z3 = (x * (DA - CB) ** 2) % p
+            X2 = (AA * BB) % p
+            Z2 = (E * (BB + a24 * E)) % p
+
+        mask = -swap
+        X2 ^= mask & (X2 ^ X3)
+        Z2 ^= mask & (Z2 ^ Z3)
+        return X2, Z2
+
+    # short Weierstrass form: u = (3x + A) / 3B, v = y / B,
+    # v^2 = u^3 + a*u + b
+
+    def to_weierstrass(self):
+        """
+        Isomorphic Curve in short Weierstrass form (with mapped generator)
+        """
+        p = self.module
+        A, B = self.A, self.B
+        i3B = invmod(3 * B, p)
+        a = ((3 - A * A) * i3B * i3B * 3) % p
+        b = ((2 * A ** 3 - 9 * A) * pow(i3B, 3, p)) % p
+        g = self.point_to_weierstrass(self.g) if self.g is not None else None
+        return Curve(a, b, p, g, self.order, self.cofactor)
+
+    def point_to_weierstrass(self, P):
+        if P == NULL_POINT:
+            return NULL_POINT
+        p = self.module
+        x, y = P
+        iB = invmod(self.B, p)
+        return (((3 * x + self.A) * invmod(3, p) * iB) % p, (y * iB) % p)
+
+    def point_from_weierstrass(self, P):
+        if P == NULL_POINT:
+            return NULL_POINT
+        p = self.module
+        u, v = P
+        return ((self.B * u - self.A * invmod(3, p)) % p, (self.B * v) % p)
+
+    @classmethod
+    def from_weierstrass(cls, curve, rng=None):
+        """
+        Montgomery form of @curve (Curve) with mapped generator,
+        the map is then given by point_from_weierstrass.
+        Exists if x^3 + ax + b has a root r with 3r^2 + a being a square
+        (in particular, the points count is divisible by 4),
+        ValueError is raised otherwise.
+        """
+        p = curve.module
+        rng = get_rng(rng)
+        for r in _poly_roots([curve.b % p, curve.a % p, 0, 1], p, rng):
+            t = (3 * r * r + curve.a) % p
+            if jacobi(t, p) != 1:
+                continue
+            s = invmod(sqrtmod_prime(t, p)[0], p)
+            res = cls((3 * r * s) % p, s, p,
+                      order=curve.order, cofactor=curve.cofactor)
+            if curve.g is not None:
+                res.g = res.point_from_weierstrass(curve.g)
+            return res
+        raise ValueError("curve has no Montgomery form")
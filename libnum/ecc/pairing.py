@@ -0,0 +1,190 @@
+#-*- coding:utf-8 -*-
+
+"""
+Tate and Weil pairings on Curve (y^2 = x^3 + ax + b over F_p),
+values are in ExtensionField F_{p^k}, k is the embedding degree.
+Points are (x, y) tuples of integers (points over F_p)
+or of field elements.
+"""
+
+from ..compat import xrange
+from .curve import NULL_POINT
+
+__all__ = ('embedding_degree', 'tate_pairing', 'weil_pairing')
+
+
+_CYCLOTOMIC = {}
+
+
+def embedding_degree(p, r, limit=64):
+    """
+    Least k : r | p^k - 1, None if it is greater than @limit.
+    """
+    t = p % r
+    x = t
+    for k in xrange(1, limit + 1):
+        if x == 1:
+            return k
+        x = (x * t) % r
+    return None
+
+
+def tate_pairing(curve, P, Q, r, field):
+    """
+    Reduced Tate pairing f_{r,P}(Q)^((p^k - 1) / r):
+    @P has order @r, @Q is a point over @field = F_{p^k}, r | p^k - 1.
+    Vertical lines are skipped when their values are killed by the
+    final exponentiation (k is even, x of @Q is in F_{p^(k/2)}).
+    ValueError is raised if Q is in <P> (then pick another Q).
+    """
+    if (field.order - 1) % r:
+        raise ValueError("r doesn't divide p^k - 1")
+    if P == NULL_POINT or Q == NULL_POINT:
+        return field.one
+    P, Q = _lift(field, P), _lift(field, Q)
+    k = field.k
+    verticals = k % 2 or Q[0].frobenius(k // 2) != Q[0]
+    f = _miller(P, Q, r, field(curve.a), verticals)
+    if f is None:
+        raise ValueError("Q is a zero or pole of f_P, pairing is degenerate")
+    return _final_exponentiation(f, r)
+
+
+def weil_pairing(curve, P, Q, r, field):
+    """
+    Weil pairing (-1)^r f_{r,P}(Q) / f_{r,Q}(P),
+    @P and @Q are points of order @r over @field = F_{p^k}.
+    Equals 1 for linearly dependent points.
+    """
+    if P == NULL_POINT or Q == NULL_POINT:
+        return field.one
+    P, Q = _lift(field, P), _lift(field, Q)
+    a = field(curve.a)
+    num = _miller(P, Q, r, a)
+    den = _miller(Q, P, r, a) if num is not None else None
+    if num is None or den is None:
+        # Q is in <P>
+        return field.one
+    res = num / den
+    return -res if r & 1 else res
+
+
+def _lift(field, P):
+    return (field(P[0]), field(P[1]))
+
+
+def _miller(P, Q, r, a, verticals=True):
+    """
+    Miller's algorithm: f_{r,P}(Q), None if Q is a zero or pole
+    of one of the lines. Numerator and denominator are kept
+    separately, so only one inversion is done.
+    """
+    xq, yq = Q
+    T = P
+    num = den = P[0].field.one
+    for bit in bin(r)[3:]:
+        l, v, T = _line(T, T, a, xq, yq)
+        num = num * num * l
+        if verticals:
+            den = den * den * v
+        if bit == "1":
+            l, v, T = _line(T, P, a, xq, yq)
+            num = num * l
+            if verticals:
+                den = den * v
+    if not num or not den:
+        return None
+    if verticals:
+        return num / den
+    return num
+
+
+def _line(T, S, a, xq, yq):
+    """
+    (l(Q), v(Q), T + S): l is the line through T and S (tangent if equal),
+    v is the vertical line through T + S. None is the null point.
+    """
+    if T is None:
+        return 1, 1, S
+    if S is None:
+        return 1, 1, T
+    xt, yt = T
+    xs, ys = S
+    if xt == xs:
+        if yt != ys or not yt:
+            # T = -S: vertical line, T + S is null
+            return xq - xt, 1, None
+        lam = (3 * xt * xt + a) / (2 * yt)
+    else:
+        lam = (ys - yt) / (xs - xt)
+    x3 = lam * lam - xt - xs
+    y3 = lam * (xt - x3) - yt
+    return yq - yt - lam * (xq - xt), xq - x3, (x3, y3)
+
+
+def _final_exponentiation(f, r):
+    """
+    f^((p^k - 1) / r). Easy part: (p^k - 1) / Φ_k(p) is a polynomial
+    in p, computed with Frobenius maps (p-th powers are linear).
+    Hard part: Φ_k(p) / r by square-and-multiply.
+    """
+    field = f.field
+    p, k = field.p, field.k
+    easy = _poly_product([_cyclotomic(d) for d in xrange(1, k) if k % d == 0])
+    hard, rem = divmod(_poly_value(_cyclotomic(k), p), r)
+    if rem:
+        # r | p^d - 1 for d < k
+        return f ** ((field.order - 1) // r)
+
+    res = field.one
+    for i, c in enumerate(easy):
+        if c:
+            res = res * f.frobenius(i) ** c
+    return res ** hard
+
+
+def _cyclotomic(n):
+    """
+    Coefficients of n-th cyclotomic polynomial (lowest first):
+    (x^n - 1) divided by Φ_d for proper divisors d of n.
+    """
+    if n not in _CYCLOTOMIC:
+        res = [-1] + [0] * (n - 1) + [1]
+        for d in xrange(1, n):
+            if n % d == 0:
+                res = _poly_exact_div(res, _cyclotomic(d))
+        _CYCLOTOMIC[n] = res
+    return _CYCLOTOMIC[n]
+
+
+def _poly_exact_div(f, g):
+    """
+    f / g for integer polynomials, g is monic and divides f
+    """
+    f = list(f)
+    dg = len(g) - 1
+    q = [0] * (len(f) - dg)
+    for i in xrange(len(f) - 1, dg - 1, -1):
+        c = f[i]
+        q[i - dg] = c
+        for j in xrange(dg + 1):
+            f[i - dg + j] -= c * g[j]
+    return q
+
+
+def _poly_product(polys):
+    res = [1]
+    for g in polys:
+        prod = [0] * (len(res) + len(g) - 1)
+        for i, x in enumerate(res):
+            for j, y in enumerate(g):
+                prod[i + j] += x * y
+        res = prod
+    return res
+
+
+def _poly_value(f, x):
+    res = 0
+    for c in reversed(f):
+        res = res * x + c
+    return res
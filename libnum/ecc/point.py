@@ -0,0 +1,151 @@
+#-*- coding:utf-8 -*-
+
+import numbers
+
+from .curve import NULL_POINT
+
+__all__ = ('Point',)
+
+
+class Point(object):
+    """
+    Point on a curve, created by Curve.point(x, y).
+    Supports P + Q, P - Q, -P, n * P, ==, hashing and unpacking: x, y = P.
+    Equal points have equal hashes and compare equal to (x, y) tuples,
+    so points and tuples may be mixed in dicts and Curve methods.
+    Sums and multiples are kept in Jacobian coordinates and
+    normalized (one inversion) only when x, y or hash are needed.
+    """
+
+    __slots__ = ('curve', '_affine', '_jacobian')
+
+    def __init__(self, curve, x, y):
+        self.curve = curve
+        self._affine = (x, y)
+        self._jacobian = None
+
+    @classmethod
+    def _from_jacobian(cls, curve, jacobian):
+        point = cls.__new__(cls)
+        point.curve = curve
+        point._affine = None
+        point._jacobian = jacobian
+        return point
+
+    def affine(self):
+        """
+        (x, y) tuple, NULL_POINT for null point
+        """
+        if self._affine is None:
+            self._affine = self.curve._to_affine(self._jacobian)
+        return self._affine
+
+    def jacobian(self):
+        """
+        (X, Y, Z) : x = X / Z**2, y = Y / Z**3
+        """
+        if self._jacobian is None:
+            self._jacobian = self.curve._to_jacobian(self._affine)
+        return self._jacobian
+
+    @property
+    def x(self):
+        return self.affine()[0]
+
+    @property
+    def y(self):
+        return self.affine()[1]
+
+    def is_null(self):
+        if self._affine is not None:
+            return self._affine == NULL_POINT
+        return self._jacobian[2] == 0
+
+    def __iter__(self):
+        return iter(self.affine())
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, i):
+        return self.affine()[i]
+
+    def __hash__(self):
+        return hash(self.affine())
+
+    def __repr__(self):
+        return "Point(%r, %r)" % self.affine()
+
+    def __eq__(self, other):
+        if isinstance(other, Point):
+            if other.curve is not self.curve:
+                return False
+            if self._affine is not None and other._affine is not None:
+                return self._affine == other._affine
+            other = other.jacobian()
+        elif isinstance(other, tuple) and len(other) == 2:
+            if self._affine is not None:
+                return self._affine == other
+            other = self.curve._to_jacobian(other)
+        else:
+            return NotImplemented
+
+        # compare in Jacobian coordinates, no inversions
+        X1, Y1, Z1 = self.jacobian()
+        X2, Y2, Z2 = other
+        if Z1 == 0 or Z2 == 0:
+            return Z1 == Z2 == 0
+        m = self.curve.module
+        Z1Z1 = (Z1 * Z1) % m
+        Z2Z2 = (Z2 * Z2) % m
+        return ((X1 * Z2Z2 - X2 * Z1Z1) % m == 0 and
+                (Y1 * Z2 * Z2Z2 - Y2 * Z1 * Z1Z1) % m == 0)
+
+    def __ne__(self, other):
+        res = self.__eq__(other)
+        if res is NotImplemented:
+            return res
+        return not res
+
+    def __add__(self, other):
+        curve = self.curve
+        if isinstance(other, Point):
+            if other.curve is not curve:
+                raise ValueError("points are on different curves")
+            if other._affine is None:
+                res = curve._jacobian_add(self.jacobian(), other._jacobian)
+                return Point._from_jacobian(curve, res)
+            other = other._affine
+        elif not isinstance(other, tuple):
+            return NotImplemented
+        res = curve._jacobian_add_affine(self.jacobian(), other)
+        return Point._from_jacobian(curve, res)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        if self._affine is not None:
+            return Point(self.curve, *self.curve.neg(self._affine))
+        X, Y, Z = self._jacobian
+        return Point._from_jacobian(self.curve,
+                                    (X, (-Y) % self.curve.module, Z))
+
+    def __sub__(self, other):
+        if isinstance(other, tuple):
+            other = self.curve.neg(other)
+        elif isinstance(other, Point):
+            other = -other
+        else:
+            return NotImplemented
+        return self + other
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, n):
+        if not isinstance(n, numbers.Integral):
+            return NotImplemented
+        res = self.curve._power_jacobian(self.affine(), n)
+        return Point._from_jacobian(self.curve, res)
+
+    __rmul__ = __mul__
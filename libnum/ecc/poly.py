@@ -0,0 +1,232 @@
+#-*- coding:utf-8 -*-
+
+"""
+Polynomials over F_p: lists of coefficients, lowest first,
+no trailing zeros (zero polynomial is []).
+"""
+
+from ..compat import xrange
+from ..common import len_in_bits
+
+
+class _ZeroDivisor(Exception):
+    def __init__(self, factor):
+        Exception.__init__(self)
+        self.factor = factor
+
+
+def _poly_trim(f):
+    while f and not f[-1]:
+        f.pop()
+    return f
+
+
+def _poly_add(f, g, p):
+    if len(f) < len(g):
+        f, g = g, f
+    res = list(f)
+    for i, c in enumerate(g):
+        res[i] = (res[i] + c) % p
+    return _poly_trim(res)
+
+
+def _poly_sub(f, g, p):
+    res = list(f) + [0] * (len(g) - len(f))
+    for i, c in enumerate(g):
+        res[i] = (res[i] - c) % p
+    return _poly_trim(res)
+
+
+def _poly_mul(f, g, p):
+    """
+    Product by Kronecker substitution: coefficients are packed
+    into one big integer (hex digits), multiplied and unpacked.
+    """
+    if not f or not g:
+        return []
+    if len(f) == 1 or len(g) == 1:
+        c, h = (f[0], g) if len(f) == 1 else (g[0], f)
+        return _poly_trim([(c * x) % p for x in h])
+
+    bits = 2 * len_in_bits(p) + len_in_bits(min(len(f), len(g)))
+    w = (bits + 3) >> 2  # hex digits per coefficient
+    fmt = "%0" + str(w) + "x"
+    x = int("".join(fmt % c for c in reversed(f)), 16)
+    y = int("".join(fmt % c for c in reversed(g)), 16)
+    s = "%x" % (x * y)
+
+    n = len(f) + len(g) - 1
+    s = s.rjust(n * w, "0")
+    res = [int(s[i - w:i], 16) % p for i in xrange(n * w, 0, -w)]
+    return _poly_trim(res)
+
+
+def _poly_pow(f, e, p):
+    res = [1]
+    for bit in bin(e)[2:]:
+        res = _poly_mul(res, res, p)
+        if bit == "1":
+            res = _poly_mul(res, f, p)
+    return res
+
+
+def _poly_divmod(f, g, p):
+    """
+    (q, r) : f = q*g + r, deg r < deg g
+    """
+    r = list(f)
+    dg = len(g) - 1
+    if len(r) <= dg:
+        return [], r
+    lead = pow(g[-1], p - 2, p)
+    q = [0] * (len(r) - dg)
+    for i in xrange(len(r) - 1, dg - 1, -1):
+        c = (r[i] * lead) % p
+        if not c:
+            continue
+        q[i - dg] = c
+        base = i - dg
+        for j in xrange(dg):
+            r[base + j] = (r[base + j] - c * g[j]) % p
+    return _poly_trim(q), _poly_trim(r[:dg])
+
+
+def _poly_gcd(f, g, p):
+    """
+    Monic gcd of @f and @g.
+    """
+    while g:
+        f, g = g, _poly_divmod(f, g, p)[1]
+    if not f:
+        return f
+    lead = pow(f[-1], p - 2, p)
+    return [(c * lead) % p for c in f]
+
+
+class _PolyRing(object):
+    """
+    Arithmetic in F_p[x] / (h), @h is monic.
+    Reduction uses precomputed inverse of reversed @h
+    (two multiplications instead of long division).
+    """
+
+    def __init__(self, h, p):
+        self.h = h
+        self.p = p
+        self.d = len(h) - 1
+        # 1 / rev(h) mod x^(d-1)
+        self._hinv = _series_inverse(h[::-1], max(self.d - 1, 1), p)
+
+    def reduce(self, f):
+        """
+        f mod h, deg f <= 2 deg h - 2
+        """
+        d = self.d
+        if len(f) <= d:
+            return f
+        p = self.p
+        k = len(f) - d  # number of quotient coefficients
+        # rev(q) = rev(f) / rev(h) mod x^k
+        q = _poly_mul(f[:-k - 1:-1], self._hinv[:k], p)[:k]
+        q = _poly_trim((q + [0] * (k - len(q)))[::-1])
+        return _poly_sub(f[:d], _poly_mul(q, self.h, p)[:d], p)
+
+    def mul(self, f, g):
+        return self.reduce(_poly_mul(f, g, self.p))
+
+    def pow(self, f, e):
+        res = [1]
+        f = self.reduce(f)
+        for bit in bin(e)[2:]:
+            res = self.mul(res, res)
+            if bit == "1":
+                res = self.mul(res, f)
+        return res
+
+    def inv(self, f):
+        """
+        Inverse modulo h, raise _ZeroDivisor with a factor of h
+        if there is none.
+        """
+        p = self.p
+        r0, r1 = self.h, f
+        s0, s1 = [], [1]
+        while r1:
+            q, r = _poly_divmod(r0, r1, p)
+            r0, r1 = r1, r
+            s0, s1 = s1, _poly_sub(s0, _poly_mul(q, s1, p), p)
+        if len(r0) != 1:
+            lead = pow(r0[-1], p - 2, p)
+            raise _ZeroDivisor([(c * lead) % p for c in r0])
+        lead = pow(r0[0], p - 2, p)
+        return self.reduce([(c * lead) % p for c in s0])
+
+
+def _series_inverse(f, n, p):
+    """
+    1 / f mod x^n, f[0] != 0 (Newton iteration).
+    """
+    res = [pow(f[0], p - 2, p)]
+    k = 1
+    while k < n:
+        k = min(2 * k, n)
+        e = _poly_mul(f[:k], res, p)[:k]
+        e = _poly_sub([2], e, p)
+        res = _poly_mul(res, e, p)[:k]
+    return res
+
+
+def _poly_roots(f, p, rng):
+    """
+    List of distinct roots of @f in F_p, @p is an odd prime
+    (gcd with x^p - x, then random splitting: Cantor-Zassenhaus).
+    """
+    f = _poly_gcd(f, [], p)  # monic
+    if len(f) < 2:
+        return []
+    x = [0, 1]
+    g = _poly_gcd(_poly_sub(_PolyRing(f, p).pow(x, p), x, p), f, p)
+
+    roots = []
+    stack = [g]
+    while stack:
+        h = stack.pop()
+        if len(h) < 2:
+            continue
+        if len(h) == 2:
+            roots.append((-h[0]) % p)
+            continue
+        while True:
+            r = rng.randint(0, p - 1)
+            s = _PolyRing(h, p).pow([r, 1], (p - 1) >> 1)
+            d = _poly_gcd(_poly_sub(s, [1], p), h, p)
+            if 1 < len(d) < len(h):
+                break
+        stack.append(d)
+        stack.append(_poly_divmod(h, d, p)[0])
+    return sorted(roots)
+
+
+def _poly_is_irreducible(f, p):
+    """
+    Rabin's test: monic @f of degree k is irreducible over F_p iff
+    x^(p^k) = x (mod f) and gcd(x^(p^(k/q)) - x, f) = 1 for primes q | k.
+    """
+    from ..factorize import factorize
+    k = len(f) - 1
+    if k < 1:
+        return False
+    if k == 1:
+        return True
+    ring = _PolyRing(f, p)
+    x = [0, 1]
+    # x^(p^i) for all i <= k by repeated p-th powers
+    powers = [x]
+    for i in xrange(k):
+        powers.append(ring.pow(powers[-1], p))
+    if _poly_sub(powers[k], x, p):
+        return False
+    for q in factorize(k):
+        if len(_poly_gcd(_poly_sub(powers[k // q], x, p), f, p)) != 1:
+            return False
+    return True
@@ -5,12 +5,10 @@ Some factorization methods are listed here
 """
 
 import math
-import random
-
 from functools import reduce
 from .compat import xrange
 from .primes import primes, prime_test
-from .common import gcd, nroot
+from .common import gcd, nroot, get_rng
 
 
 __all__ = "factorize unfactorize".split()
@@ -20,9 +18,10 @@ _PRIMES_CHECK = primes(100)
 _PRIMES_P1 = primes(100)
 
 
-def rho_pollard_reduce(n, f):
+def rho_pollard_reduce(n, f, rng=None):
+    rng = get_rng(rng)
     # use Pollard's (p-1) method to narrow down search
-    a = random.randint(2, n - 2)
+    a = rng.randint(2, n - 2)
     for p in _PRIMES_P1:
         a = pow(a, p, n)
 
@@ -35,18 +34,20 @@ def rho_pollard_reduce(n, f):
 
         g = gcd(Q, n)
         if g == n:
-            a = b = random.randint(2, n - 2)
+            a = b = rng.randint(2, n - 2)
             Q = 1
         elif g != 1:
             return g
 
 
-_FUNC_REDUCE = lambda n: rho_pollard_reduce(n, lambda x: (pow(x, 2, n) + 1) % n)
+_FUNC_REDUCE = lambda n, rng=None: rho_pollard_reduce(
+    n, lambda x: (pow(x, 2, n) + 1) % n, rng)
 
 
-def factorize(n):
+def factorize(n, rng=None):
     """
     Use _FUNC_REDUCE (defaults to rho-pollard method) to factorize @n
+    Optional arg @rng defines random generator (see get_rng).
     Return a dict like {p: e}
     """
     if n in (0, 1):
@@ -72,22 +73,22 @@ def factorize(n):
     while factors:
         n = factors.pop()
 
-        if prime_test(n):
+        if prime_test(n, rng=rng):
             p = n
             prime_factors[p] = prime_factors.get(p, 0) + 1
             continue
 
         is_pp = is_power(n)
         if is_pp:
-            if prime_test(p):
-                p, e = is_pp
+            p, e = is_pp
+            if prime_test(p, rng=rng):
                 prime_factors[p] = prime_factors.get(p, 0) + e
                 continue
             # else we need to factor @p and remember power
             # it's not implemented now
             # / it doesn't fasten factorize much
 
-        divizor = _FUNC_REDUCE(n)
+        divizor = _FUNC_REDUCE(n, rng)
         other = n // divizor
         factors.append(divizor)
         if other > 1:
@@ -2,6 +2,7 @@
 
 import operator
 
+from array import array
 from functools import reduce
 from .compat import xrange
 from .common import *
@@ -66,6 +67,384 @@ def solve_crt(remainders, modules):
     return x % N
 
 
+class CRTPlan(object):
+    """
+    Precomputed plan to solve Chinese Remainder Theorem
+    for many remainder vectors over the same @modules.
+    Garner's (mixed-radix) algorithm is used, so @modules
+    need not be coprime: ValueError is raised on solve
+    if remainders are inconsistent.
+    """
+
+    def __init__(self, modules):
+        modules = tuple(modules)
+        if len(modules) == 0:
+            raise ValueError("Empty lists are given")
+
+        # step: (module, gcd with previous modulus,
+        #        reduced module, coefficient, previous modulus)
+        steps = []
+        N = modules[0]
+        for module in modules[1:]:
+            g = gcd(N, module)
+            mg = module // g
+            c = invmod(N // g, mg) if mg > 1 else 0
+            steps.append((module, g, mg, c, N))
+            N *= mg
+
+        self.modules = modules
+        self.modulus = N  # lcm of modules
+        self._steps = steps
+
+    def solve(self, remainders):
+        """
+        Return x (mod lcm of modules) : x = remainders[i] (mod modules[i])
+        """
+        if len(remainders) != len(self.modules):
+            raise TypeError("modules and remainders lists must have same len")
+
+        x = remainders[0] % self.modules[0]
+        for i, (module, g, mg, c, N) in enumerate(self._steps):
+            d = remainders[i + 1] - x
+            if g != 1:
+                if d % g:
+                    raise ValueError("no solution for given remainders")
+                if mg == 1:
+                    continue
+                d //= g
+            x += N * ((d * c) % mg)
+        return x
+
+    def solve_many(self, matrix):
+        """
+        Return list of solutions for each remainders vector in @matrix.
+        """
+        solve = self.solve
+        return [solve(remainders) for remainders in matrix]
+
+
+_CRT_PLANS = {}
+_CRT_PLANS_SIZE = 64
+
+
+def _get_crt_plan(modules):
+    """
+    Return cached CRTPlan for @modules.
+    """
+    modules = tuple(modules)
+    try:
+        return _CRT_PLANS[modules]
+    except KeyError:
+        pass
+    plan = CRTPlan(modules)
+    if len(_CRT_PLANS) >= _CRT_PLANS_SIZE:
+        _CRT_PLANS.clear()
+    _CRT_PLANS[modules] = plan
+    return plan
+
+
+def carmichael_lambda(n, factors=None):
+    """
+    Return Carmichael function lambda(n): exponent of (Z/nZ)*.
+    @factors - factorization of @n (computed if not given).
+    """
+    return _carmichael_lambda(n, factors)[0]
+
+
+def multiplicative_order(a, n, factors=None):
+    """
+    Return least k > 0 : a**k = 1 (mod n).
+    @factors - factorization of @n (computed if not given).
+    Only maximal proper divisors of lambda(n) are tested.
+    """
+    if n < 2:
+        raise ValueError("modulus must be greater than 1")
+    if gcd(a, n) != 1:
+        raise ValueError("no multiplicative order for given @a and @n")
+
+    order, order_factors = _carmichael_lambda(n, factors)
+    for q, e in order_factors.items():
+        for i in xrange(e):
+            if pow(a, order // q, n) != 1:
+                break
+            order //= q
+    return order
+
+
+def primitive_root(p):
+    """
+    Return the least primitive root modulo prime @p.
+    """
+    try:
+        return _PRIMITIVE_ROOTS[p]
+    except KeyError:
+        pass
+
+    from .primes import prime_test
+    if p < 2 or not prime_test(p):
+        raise ValueError("modulus must be prime: %s" % p)
+
+    if p == 2:
+        g = 1
+    else:
+        order, order_factors = _carmichael_lambda(p, {p: 1})
+        g = 2
+        while True:
+            for q in order_factors:
+                if pow(g, order // q, p) == 1:
+                    break
+            else:
+                break
+            g += 1
+
+    if len(_PRIMITIVE_ROOTS) >= _PRIMITIVE_ROOTS_SIZE:
+        _PRIMITIVE_ROOTS.clear()
+    _PRIMITIVE_ROOTS[p] = g
+    return g
+
+
+_PRIMITIVE_ROOTS = {}
+_PRIMITIVE_ROOTS_SIZE = 1024
+
+_CARMICHAEL = {}
+_CARMICHAEL_SIZE = 1024
+
+
+def _carmichael_lambda(n, factors=None):
+    """
+    Return (lambda(n), factorization of lambda(n)), results are cached.
+    """
+    try:
+        return _CARMICHAEL[n]
+    except KeyError:
+        pass
+
+    from .factorize import factorize
+    if factors is None:
+        factors = factorize(n)
+
+    lam = 1
+    lam_factors = {}
+    for p, e in factors.items():
+        if p < 2:  # factorize(1) == {1: 1}
+            continue
+        if p == 2:
+            parts = {2: e - 2 if e >= 3 else e - 1}
+        else:
+            parts = factorize(p - 1)
+            if e > 1:
+                parts[p] = parts.get(p, 0) + e - 1
+        for q, k in parts.items():
+            if q > 1 and k > lam_factors.get(q, 0):
+                lam_factors[q] = k
+
+    for q, k in list(lam_factors.items()):
+        if not k:
+            del lam_factors[q]
+        else:
+            lam *= q ** k
+
+    res = lam, lam_factors
+    if len(_CARMICHAEL) >= _CARMICHAEL_SIZE:
+        _CARMICHAEL.clear()
+    _CARMICHAEL[n] = res
+    return res
+
+
+class Zmod(object):
+    """
+    Arithmetic modulo fixed @n.
+    Keeps per-modulus precomputations so that repeated work against
+    the same modulus amortizes its setup:
+        - cache of inverses
+        - fixed-base exponentiation table (see set_base)
+        - factorization of @n if known (needed for sqrt)
+    """
+
+    INV_CACHE_SIZE = 1 << 16
+
+    def __init__(self, n, factors=None):
+        if n < 2:
+            raise ValueError("modulus must be greater than 1")
+        self.n = n
+        self.factors = factors
+        self._inverses = {}
+        self._base = None
+        self._base_window = None
+        self._base_table = None
+
+    def __repr__(self):
+        return "Zmod(%d)" % self.n
+
+    def mul(self, a, b):
+        return (a * b) % self.n
+
+    def mul_many(self, xs, ys):
+        """
+        Return list of pairwise products of @xs and @ys.
+        """
+        n = self.n
+        return [(a * b) % n for a, b in zip(xs, ys)]
+
+    def pow(self, a, e):
+        """
+        Return a**e (mod n), negative @e means power of inverse.
+        Uses the fixed-base table if @a is the base set by set_base.
+        """
+        if e < 0:
+            return self.pow(self.inv(a), -e)
+        if self._base_table is not None and a % self.n == self._base:
+            return self.pow_base(e)
+        return pow(a, e, self.n)
+
+    def pow_many(self, values, e):
+        """
+        Return list of v**e (mod n) for v in @values.
+        """
+        if e < 0:
+            values = self.inv_many(values)
+            e = -e
+        n = self.n
+        return [pow(v, e, n) for v in values]
+
+    def inv(self, a):
+        """
+        Return 1 / a (mod n), results are cached.
+        """
+        a %= self.n
+        try:
+            return self._inverses[a]
+        except KeyError:
+            pass
+        res = invmod(a, self.n)
+        if len(self._inverses) >= self.INV_CACHE_SIZE:
+            self._inverses.clear()
+        self._inverses[a] = res
+        return res
+
+    def inv_many(self, values):
+        """
+        Return list of inverses of @values.
+        Montgomery's trick: only one modular inversion is done.
+        """
+        n = self.n
+        values = [v % n for v in values]
+        if not values:
+            return []
+
+        prefix = []
+        acc = 1
+        for v in values:
+            acc = (acc * v) % n
+            prefix.append(acc)
+
+        try:
+            acc = invmod(acc, n)
+        except ValueError:
+            raise ValueError("no invmod for some of given values and @n")
+
+        res = [0] * len(values)
+        for i in xrange(len(values) - 1, 0, -1):
+            res[i] = (acc * prefix[i - 1]) % n
+            acc = (acc * values[i]) % n
+        res[0] = acc
+        return res
+
+    def sqrt(self, a):
+        """
+        Yield square roots of @a, factorization of modulus is needed.
+        """
+        if not self.factors:
+            raise ValueError("factorization of modulus is needed for sqrt")
+        from .sqrtmod import sqrtmod
+        return sqrtmod(a % self.n, self.factors)
+
+    def sqrt_many(self, values):
+        """
+        Return list of lists of square roots of @values,
+        ValueError is raised if some value has none.
+        Prime powers of the modulus and CRT basis are computed once.
+        """
+        if not self.factors:
+            raise ValueError("factorization of modulus is needed for sqrt")
+        from .sqrtmod import _sqrtmod_many
+        return _sqrtmod_many([a % self.n for a in values], self.factors)
+
+    def set_base(self, g, window=4, bits=None):
+        """
+        Precompute table for fast exponentiation of fixed base @g.
+        Table has ceil(@bits / @window) rows of 2**@window - 1 entries;
+        @bits defaults to the bit length of the modulus.
+        Exponentiation then takes one multiplication per window
+        and no squarings.
+        """
+        if window < 1:
+            raise ValueError("window must be positive: %s" % window)
+        if bits is None:
+            bits = len_in_bits(self.n)
+
+        n = self.n
+        g %= n
+        table = []
+        base = g
+        for i in xrange(ceil(bits, window)):
+            row = [1, base]
+            for j in xrange(2, 1 << window):
+                row.append((row[-1] * base) % n)
+            table.append(row)
+            base = (row[-1] * base) % n
+
+        self._base = g
+        self._base_window = window
+        self._base_table = table
+
+    def pow_base(self, e):
+        """
+        Return g**e (mod n) for the base @g set by set_base.
+        """
+        if self._base_table is None:
+            raise ValueError("base is not set, call set_base first")
+        if e < 0:
+            return self.inv(self.pow_base(-e))
+
+        table = self._base_table
+        window = self._base_window
+        if e >> (window * len(table)):
+            # exponent is out of the table
+            return pow(self._base, e, self.n)
+
+        n = self.n
+        mask = (1 << window) - 1
+        res = 1
+        i = 0
+        while e:
+            digit = e & mask
+            if digit:
+                res = (res * table[i][digit]) % n
+            e >>= window
+            i += 1
+        return res
+
+    def pow_base_many(self, exponents):
+        """
+        Return list of g**e (mod n) for e in @exponents.
+        """
+        return [self.pow_base(e) for e in exponents]
+
+    # multiplicative group interface (see libnum.dlog)
+
+    identity = 1
+
+    def op(self, a, b):
+        return (a * b) % self.n
+
+    def power(self, a, e):
+        return self.pow(a, e)
+
+    def inverse(self, a):
+        return self.inv(a)
+
+
 def nCk_mod(n, k, factors):
     """
     Compute nCk modulo, factorization of modulus is needed
@@ -75,7 +454,7 @@ def nCk_mod(n, k, factors):
     for p, e in factors.items():
         rems.append(nCk_mod_prime_power(n, k, p, e))
         mods.append(p ** e)
-    return solve_crt(rems, mods)
+    return _get_crt_plan(mods).solve(rems)
 
 
 def factorial_mod(n, factors):
@@ -92,7 +471,46 @@ def factorial_mod(n, factors):
             factmod = factorial(n) % pe
         rems.append(factmod)
         mods.append(pe)
-    return solve_crt(rems, mods)
+    return _get_crt_plan(mods).solve(rems)
+
+
+class BinomialModContext(object):
+    """
+    Compute many nCk modulo fixed number, factorization of modulus is needed.
+    Tables of factorials by each prime power are built once
+    and stored compactly as arrays.
+    """
+
+    def __init__(self, factors):
+        if not factors:
+            raise ValueError("Factors can't be empty: %s" % factors)
+
+        self.factors = dict(factors)
+        self._prime_powers = []
+        for p, e in self.factors.items():
+            table = _factorial_coprime_table(p, e)
+            self._prime_powers.append((p, e, table))
+        self._plan = CRTPlan([p ** e for p, e, table in self._prime_powers])
+        self.modulus = self._plan.modulus
+
+    def nCk(self, n, k):
+        """
+        Return nCk modulo the context modulus.
+        """
+        if n < 0:
+            raise ValueError("Invalid value for n: %s" % n)
+        if k < 0 or k > n:
+            return 0
+        rems = [_nCk_mod_prime_power(n, k, p, e, table)
+                for p, e, table in self._prime_powers]
+        return self._plan.solve(rems)
+
+    def nCk_many(self, queries):
+        """
+        Return list of nCk for each (n, k) in @queries.
+        """
+        nCk = self.nCk
+        return [nCk(n, k) for n, k in queries]
 
 
 def nCk_mod_prime_power(n, k, p, e):
@@ -103,58 +521,80 @@ def nCk_mod_prime_power(n, k, p, e):
     What can be optimized:
         - compute (n-k)*(n-k+1)*...*n / 1*2*...*k instead of n!, k!, r!
         - ...
+    Use BinomialModContext to reuse tables across calls.
     """
+    modpow = e - _nCk_get_prime_pow(n, k, p)
+    if modpow <= 0:
+        return 0
+    return _nCk_mod_prime_power(n, k, p, e, _factorial_coprime_table(p, modpow))
 
-    def nCk_get_prime_pow(n, k, p):
-        res = factorial_get_prime_pow(n, p)
-        res -= factorial_get_prime_pow(k, p)
-        res -= factorial_get_prime_pow(n - k, p)
-        return res
-
-    def nCk_get_non_prime_part(n, k, p, e):
-        pe = p ** e
-        r = n - k
 
-        fact_pe = [1]
-        acc = 1
-        for x in xrange(1, pe):
-            if x % p == 0:
-                x = 1
+def _factorial_coprime_table(p, e):
+    """
+    Return array: table[x] = product of 1..x without multiples of @p,
+    modulo p**e,  0 <= x < p**e.
+    """
+    pe = p ** e
+    table = array("L" if pe <= 1 << 32 else "Q", [1])
+    acc = 1
+    for x in xrange(1, pe):
+        if x % p:
             acc = (acc * x) % pe
-            fact_pe.append(acc)
+        table.append(acc)
+    return table
 
-        top = bottom =1
-        is_negative = 0
-        digits = 0
 
-        while n != 0:
-            if acc != 1:
-                if digits >= e:
-                    is_negative ^= n & 1
-                    is_negative ^= r & 1
-                    is_negative ^= k & 1
+def _nCk_get_prime_pow(n, k, p):
+    res = factorial_get_prime_pow(n, p)
+    res -= factorial_get_prime_pow(k, p)
+    res -= factorial_get_prime_pow(n - k, p)
+    return res
 
-            top = (top * fact_pe[n % pe]) % pe
-            bottom = (bottom * fact_pe[r % pe]) % pe
-            bottom = (bottom * fact_pe[k % pe]) % pe
 
-            n //= p
-            r //= p
-            k //= p
-
-            digits += 1
-
-        res = (top * invmod(bottom, pe)) % pe
-        if p != 2 or e < 3:
-            if is_negative:
-                res = pe - res
-        return res
-
-    prime_part_pow = nCk_get_prime_pow(n, k, p)
+def _nCk_mod_prime_power(n, k, p, e, table):
+    """
+    Compute nCk mod p**e using factorials @table built for p**E, E >= e
+    (only products modulo p**modpow <= p**E are needed).
+    """
+    prime_part_pow = _nCk_get_prime_pow(n, k, p)
     if prime_part_pow >= e:
         return 0
 
     modpow = e - prime_part_pow
 
-    r = nCk_get_non_prime_part(n, k, p, modpow) % (p ** modpow)
+    r = _nCk_get_non_prime_part(n, k, p, modpow, table) % (p ** modpow)
     return ((p ** prime_part_pow) * r) % (p ** e)
+
+
+def _nCk_get_non_prime_part(n, k, p, e, table):
+    pe = p ** e
+    r = n - k
+
+    acc = table[pe - 1] % pe
+
+    top = bottom = 1
+    is_negative = 0
+    digits = 0
+
+    while n != 0:
+        if acc != 1:
+            if digits >= e:
+                is_negative ^= n & 1
+                is_negative ^= r & 1
+                is_negative ^= k & 1
+
+        top = (top * table[n % pe]) % pe
+        bottom = (bottom * table[r % pe]) % pe
+        bottom = (bottom * table[k % pe]) % pe
+
+        n //= p
+        r //= p
+        k //= p
+
+        digits += 1
+
+    res = (top * invmod(bottom, pe)) % pe
+    if p != 2 or e < 3:
+        if is_negative:
+            res = pe - res
+    return res
@@ -1,7 +1,6 @@
 #-*- coding:utf-8 -*-
 
-import math
-import random
+import bisect
 import operator
 
 from functools import reduce
@@ -15,6 +14,8 @@ _small_primes_product = 1
 _primes_bits = [[] for i in range(11)]
 _primes_mask = []
 
+_PRIME_CANDIDATES_BATCH = 16
+
 
 def _init():
     global _small_primes_product, _primes, _primes_bits, _primes_mask
@@ -28,58 +29,59 @@ def _init():
 
 def primes(until):
     """
-    Return list of primes not greater than @until. Rather slow.
+    Return list of primes not greater than @until.
     """
-    global _primes, _primes_mask
-
     if until < 2:
         return []
-
     if until <= _primes[-1]:
-        for index, prime in enumerate(_primes):
-            if prime > until:
-                return _primes[:index]
-
-    i = _primes[-1]
-    while i < until + 1:
-        i += 2
-        sqrt = math.sqrt(i) + 1
-        for j in _primes:
-            if i % j == 0:
-                break
-            if j > sqrt:
-                _primes.append(i)
-                break
-    return _primes
-
-
-def generate_prime(size, k=25):
+        return _primes[:bisect.bisect_right(_primes, until)]
+    return _sieve(until)
+
+
+def _sieve(n):
+    """
+    Return list of primes not greater than @n (sieve of Eratosthenes).
+    """
+    mask = bytearray([1]) * (n + 1)
+    mask[0] = mask[1] = 0
+    for i in xrange(2, int(n ** 0.5) + 1):
+        if mask[i]:
+            mask[i * i::i] = bytearray(len(xrange(i * i, n + 1, i)))
+    return [i for i in xrange(n + 1) if mask[i]]
+
+
+def generate_prime(size, k=25, rng=None):
     """
     Generate a pseudo-prime with @size bits length.
     Optional arg @k=25 defines number of tests.
+    Optional arg @rng defines random generator (see get_rng).
     """
     if size < 2:
         raise ValueError("No primes smaller than 2 bits!")
 
+    rng = get_rng(rng)
     if size <= 10:
-        return random.choice(_primes_bits[size])
+        return rng.choice(_primes_bits[size])
 
     while True:
-        n = randint_bits(size) | 1  # only odd
+        # candidates are drawn in batches to save on rng calls
+        for n in randints_bits(size, _PRIME_CANDIDATES_BATCH, rng):
+            n |= 1  # only odd
 
-        if gcd(_small_primes_product, n) != 1:
-            continue
+            if gcd(_small_primes_product, n) != 1:
+                continue
 
-        if prime_test(n, k):
-            return n
+            if prime_test(n, k, rng):
+                return n
     return
 
 
-def generate_prime_from_string(s, size=None, k=25):
+def generate_prime_from_string(s, size=None, k=25, rng=None):
     """
     Generate a pseudo-prime starting with @s in string representation.
     Optional arg @size defines length in bits, if is not set than +some bytes.
     Optional arg @k=25 defines number of tests.
+    Optional arg @rng defines random generator (see get_rng).
     """
     if not size:
         if len(s) > 512:
@@ -93,23 +95,24 @@ def generate_prime_from_string(s, size=None, k=25):
     if size % 8:
         raise ValueError("size must be 8*n")
 
+    rng = get_rng(rng)
     extend_len = size - len(s) * 8
 
     visible_part = s2n(s) << extend_len
     hi = 2 ** extend_len
 
     while True:
-        n = visible_part | random.randint(1, hi) | 1  # only even
+        n = visible_part | rng.randint(1, hi) | 1  # only even
 
         if gcd(_small_primes_product, n) != 1:
             continue
 
-        if prime_test(n, k):
+        if prime_test(n, k, rng):
             return n
     return
 
 
-def prime_test_ferma(p, k=25):
+def prime_test_ferma(p, k=25, rng=None):
     """
     Test for primality based on Ferma's Little Theorem
     Totally fails in Carmichael'e numbers
@@ -118,8 +121,9 @@ def prime_test_ferma(p, k=25):
     if p <= 3: return True
     if p & 1 == 0: return False
 
+    rng = get_rng(rng)
     for j in xrange(k):
-        a = random.randint(2, p - 1)
+        a = rng.randint(2, p - 1)
         if gcd(a, p) != 1:
             return False
 
@@ -129,7 +133,7 @@ def prime_test_ferma(p, k=25):
     return True
 
 
-def prime_test_solovay_strassen(p, k=25):
+def prime_test_solovay_strassen(p, k=25, rng=None):
     """
     Test for primality by Solovai-Strassen
     Stronger than Ferma's test
@@ -138,8 +142,9 @@ def prime_test_solovay_strassen(p, k=25):
     if p <= 3: return True
     if p & 1 == 0: return False
 
+    rng = get_rng(rng)
     for j in xrange(k):
-        a = random.randint(2, p - 1)
+        a = rng.randint(2, p - 1)
         if gcd(a, p) != 1:
             return False
 
@@ -152,7 +157,7 @@ def prime_test_solovay_strassen(p, k=25):
     return True
 
 
-def prime_test_miller_rabin(p, k=25):
+def prime_test_miller_rabin(p, k=25, rng=None):
     """
     Test for primality by Miller-Rabin
     Stronger than Solovay-Strassen's test
@@ -164,8 +169,9 @@ def prime_test_miller_rabin(p, k=25):
     # p - 1 = 2**s * m
     s, m = extract_prime_power(p - 1, 2)
 
+    rng = get_rng(rng)
     for j in range(k):
-        a = random.randint(2, p - 2)
+        a = rng.randint(2, p - 2)
         if gcd(a, p) != 1:
             return False
 
@@ -1,9 +1,11 @@
 #!/usr/bin/env python
 #-*- coding:utf-8 -*-
 
+import heapq
 import json
+import numbers
 
-from functools import reduce
+from bisect import bisect_left, bisect_right
 
 """
 TODO: fix properties for empty
@@ -11,70 +13,185 @@ or not? IndexError is ok
 max([]) = ValueError
 """
 
+# |= inserts segments one by one if the right side has at most this many
+# segments (each insertion is a memmove of the lists, merge is O(m + n))
+_ADD_RANGE_LIMIT = 8
+
 
 class Ranges(object):
     """
     Represent Int-ranges unions
     Example: 3-10 or 15-30 or 31-31
-    - operators:
-        intersection ( & )
-        union ( | )
+    - operators (one pass over sorted segments):
+        intersection ( & ), union ( | ), difference ( - ),
+        symmetric difference ( ^ ), in-place |= and &=
+    - complement(lo, hi), Ranges.union_all(iterable)
     - iterator yields all integers from ranges
     - .segments property - tuple of segments
         - len(R.segments) - count of segments
         - iter(R.segments) - iterator for segments
         - etc.
     - add_range method - unite with (x, y) range
+    - remove_range method - subtract (x, y) range
+    - from_segments - bulk constructor (sort and merge)
+    Segments are kept in sorted parallel lists of starts and ends,
+    lookups are binary searches.
     """
 
     def __init__(self, *ranges):
-        self._segments = []
-        for (a, b) in ranges:
-            self.add_range(a, b)
+        self._starts = []
+        self._ends = []
+        self._set_sorted(sorted(self._check(a, b) for a, b in ranges))
 
-    def add_range(self, x, y):
+    @classmethod
+    def from_segments(cls, segments, is_sorted=False):
+        """
+        Union of (x, y) @segments: one sort and one merging pass,
+        O(n log n) (O(n) if @is_sorted - sorted by start).
+        """
+        res = cls()
+        segments = (cls._check(a, b) for a, b in segments)
+        if not is_sorted:
+            segments = sorted(segments)
+        res._set_sorted(segments)
+        return res
+
+    @staticmethod
+    def _check(x, y):
         if y < x:
             raise ValueError("end is smaller than start: %d < %d" % (y, x))
+        return x, y
 
-        for index, (a, b) in enumerate(self._segments):
-            if y < a - 1:
-                self._segments.insert(index, (x, y))
-                return
+    def _set_sorted(self, segments):
+        """
+        Replace contents with union of @segments sorted by start,
+        adjacent and overlapping segments are merged.
+        """
+        starts = []
+        ends = []
+        for a, b in segments:
+            if ends and a <= ends[-1] + 1:
+                if b > ends[-1]:
+                    ends[-1] = b
+            else:
+                starts.append(a)
+                ends.append(b)
+        self._starts = starts
+        self._ends = ends
 
-            if x > b + 1:
-                continue
+    def add_range(self, x, y):
+        """
+        Unite with [x, y]: O(log n) search, segments meeting
+        [x - 1, y + 1] are replaced with one.
+        """
+        self._check(x, y)
+        starts, ends = self._starts, self._ends
+        i = bisect_left(ends, x - 1)
+        j = bisect_right(starts, y + 1)
+        if i < j:
+            x = min(x, starts[i])
+            y = max(y, ends[j - 1])
+        starts[i:j] = [x]
+        ends[i:j] = [y]
 
-            new_a = min(a, x)
-            new_b = max(b, y)
+    def remove_range(self, x, y):
+        """
+        Subtract [x, y]: O(log n) search, segments inside are dropped,
+        ones crossing the bounds are cut.
+        """
+        self._check(x, y)
+        starts, ends = self._starts, self._ends
+        i = bisect_left(ends, x)
+        j = bisect_right(starts, y)
+        if i >= j:
+            return
+        new_starts = []
+        new_ends = []
+        if starts[i] < x:
+            new_starts.append(starts[i])
+            new_ends.append(x - 1)
+        if ends[j - 1] > y:
+            new_starts.append(y + 1)
+            new_ends.append(ends[j - 1])
+        starts[i:j] = new_starts
+        ends[i:j] = new_ends
 
-            index2 = index + 1
-            while index2 < len(self._segments):
-                a, b = self._segments[index2]
-                if new_b < a - 1:
-                    break
+    @classmethod
+    def union_all(cls, ranges):
+        """
+        Union of iterable of Ranges: n-way merge of the sorted
+        segment lists (heapq.merge) and one merging pass.
+        """
+        res = cls()
+        res._set_sorted(heapq.merge(*[zip(r._starts, r._ends)
+                                      for r in ranges]))
+        return res
 
-                new_b = max(new_b, b)
-                del self._segments[index2]
-
-            self._segments[index] = (new_a, new_b)
-            return
-        self._segments.append((x, y))
-        return
+    def _union_sorted(self, other):
+        """
+        Sorted segments of both operands (linear merge).
+        """
+        return heapq.merge(zip(self._starts, self._ends),
+                           zip(other._starts, other._ends))
 
     def __or__(self, other):
         res = Ranges()
-        for x, y in self._segments:
-            res.add_range(x, y)
-        for x, y in other._segments:
-            res.add_range(x, y)
+        res._set_sorted(self._union_sorted(other))
         return res
 
+    def __ior__(self, other):
+        if len(other._starts) <= _ADD_RANGE_LIMIT:
+            # few insertions (memmove) are cheaper than a full pass
+            for x, y in other.segments:
+                self.add_range(x, y)
+        else:
+            self._set_sorted(self._union_sorted(other))
+        return self
+
+    def __sub__(self, other):
+        """
+        Difference: one pass over both segment lists.
+        """
+        starts, ends = other._starts, other._ends
+        n = len(starts)
+        res_starts = []
+        res_ends = []
+        j = 0
+        for a, b in zip(self._starts, self._ends):
+            while j < n and ends[j] < a:
+                j += 1
+            # other's segments from j on start after b or cut [a, b]
+            while j < n and starts[j] <= b:
+                if starts[j] > a:
+                    res_starts.append(a)
+                    res_ends.append(starts[j] - 1)
+                a = ends[j] + 1
+                if ends[j] > b:
+                    break
+                j += 1
+            if a <= b:
+                res_starts.append(a)
+                res_ends.append(b)
+        res = Ranges()
+        res._starts = res_starts
+        res._ends = res_ends
+        return res
+
+    def __xor__(self, other):
+        return (self - other) | (other - self)
+
+    def complement(self, lo, hi):
+        """
+        Integers of [lo, hi] not in the ranges.
+        """
+        return Ranges((lo, hi)) - self
+
     def __and__(self, other):
         res = []
         index1 = 0
         index2 = 0
-        list1 = self._segments
-        list2 = other._segments
+        list1 = self.segments
+        list2 = other.segments
         while index1 < len(list1) and index2 < len(list2):
             a, b = list1[index1]
             A, B = list2[index2]
@@ -98,47 +215,54 @@ class Ranges(object):
             # a..A..b..B
             res.append((A, b))
             index1 += 1
-        return Ranges(*res)
+        return Ranges.from_segments(res, is_sorted=True)
+
+    def __iand__(self, other):
+        res = self & other
+        self._starts = res._starts
+        self._ends = res._ends
+        return self
 
     def __iter__(self):
-        for a, b in self._segments:
+        for a, b in zip(self._starts, self._ends):
             while a <= b:
                 yield a
                 a += 1
         return
 
     def __eq__(self, other):
-        return self.segments == other.segments
+        return self._starts == other._starts and self._ends == other._ends
+
+    def __ne__(self, other):
+        return not self == other
 
     @property
     def len(self):
-        return reduce(lambda acc, (a, b): acc + 1 + b - a, self._segments, 0)
+        return sum(self._ends) - sum(self._starts) + len(self._starts)
 
     @property
     def min(self):
-        return self._segments[0][0]
+        return self._starts[0]
 
     @property
     def max(self):
-        return self._segments[-1][1]
+        return self._ends[-1]
 
     @property
     def segments(self):
-        return tuple(self._segments)
+        return tuple(zip(self._starts, self._ends))
 
     def __str__(self):
         return str(self.segments)
 
     def __contains__(self, other):
-        assert isinstance(other, int) or isinstance(other, long)
-        for a, b in self._segments:
-            if a <= other <= b:
-                return True
-        return False
+        assert isinstance(other, numbers.Integral)
+        i = bisect_right(self._starts, other) - 1
+        return i >= 0 and other <= self._ends[i]
 
     def to_json(self):
-        return json.dumps(self._segments)
+        return json.dumps(list(self.segments))
 
     @classmethod
     def from_json(cls, j):
-        return Ranges(*json.loads(j))
+        return cls.from_segments(json.loads(j))
@@ -1,8 +1,8 @@
 #-*- coding:utf-8 -*-
 
 import operator
-from itertools import product
 
+from functools import reduce
 from .compat import xrange
 from .common import *
 from .modular import *
@@ -25,23 +25,173 @@ def has_sqrtmod(a, factors=None):
     return True
 
 
-def sqrtmod(a, factors):
+def sqrtmod(a, factors, rng=None):
     """
     x ^ 2 = a (mod *factors).
     Yield square roots by product of @factors as modulus.
     @factors - list of (prime, power) tuples
+    Optional arg @rng defines random generator (see get_rng).
+    Roots are generated lazily: the first one is yielded immediately,
+    ValueError is raised instead if there are none.
     """
+    if not factors:
+        raise ValueError("Factors can't be empty: %s" % factors)
+
     coprime_factors = [p ** k for p, k in factors.items()]
-    #n = reduce(operator.mul, coprime_factors)
+    roots = [sqrtmod_prime_power(a % pk, p, k, rng)
+             for (p, k), pk in zip(factors.items(), coprime_factors)]
+
+    for x in _crt_combinations(roots, coprime_factors):
+        yield x
+    return
+
+
+def sqrtmod_one(a, factors, rng=None):
+    """
+    x ^ 2 = a (mod *factors).
+    Return one square root, ValueError is raised if there are none.
+    """
+    for x in sqrtmod(a, factors, rng):
+        return x
+    raise ValueError("No square root for %d" % a)
+
+
+def count_sqrtmod(a, factors):
+    """
+    Return number of square roots of @a modulo product of @factors.
+    Roots are not enumerated.
+    """
+    if not factors:
+        raise ValueError("Factors can't be empty: %s" % factors)
+
+    count = 1
+    for p, k in factors.items():
+        if p <= 1 or k <= 0:
+            raise ValueError("Not valid prime power: %s**%s" % (p, k))
+        count *= _count_sqrtmod_prime_power(a, p, k)
+        if not count:
+            break
+    return count
+
+
+def _count_sqrtmod_prime_power(a, p, k):
+    a = a % (p ** k)
+    if a == 0:
+        return p ** (k >> 1)
+
+    e, a = extract_prime_power(a, p)
+    if e & 1:
+        return 0
+
+    # x = p**(e/2) * y,  y**2 = a (mod p**(k-e)),  y (mod p**(k-e/2))
+    k -= e
+    if p == 2:
+        if k == 1:
+            count = 1
+        elif k == 2:
+            count = 2 if a & 3 == 1 else 0
+        else:
+            count = 4 if a & 7 == 1 else 0
+    else:
+        count = 2 if jacobi(a, p) == 1 else 0
+    return count * p ** (e >> 1)
+
+
+class _LazyList(object):
+    """
+    Iterable which takes items from @iterable only when needed and
+    remembers them, so that it can be iterated many times.
+    """
+
+    def __init__(self, iterable):
+        self._iter = iter(iterable)
+        self._items = []
+
+    def __iter__(self):
+        items = self._items
+        i = 0
+        while True:
+            if i == len(items):
+                if self._iter is None:
+                    return
+                try:
+                    items.append(next(self._iter))
+                except StopIteration:
+                    self._iter = None
+                    return
+            yield items[i]
+            i += 1
+
+
+def _sqrtmod_many(values, factors, rng=None):
+    """
+    Return list of lists of square roots of @values (see sqrtmod),
+    ValueError is raised for a non-residue. Prime powers
+    and CRT basis are computed once for all values.
+    """
+    if not factors:
+        raise ValueError("Factors can't be empty: %s" % factors)
 
-    sqrts = []
-    for i, (p, k) in enumerate(factors.items()):
-        # it's bad that all roots by each modulus are calculated here
-        # - we can start yielding roots faster
-        sqrts.append( list(sqrtmod_prime_power(a % coprime_factors[i], p, k) ) )
+    factors = list(factors.items())
+    coprime_factors = [p ** k for p, k in factors]
+    crt_basis = _crt_basis(coprime_factors)
+    res = []
+    for a in values:
+        roots = [sqrtmod_prime_power(a % pk, p, k, rng)
+                 for (p, k), pk in zip(factors, coprime_factors)]
+        try:
+            # a prime power without roots is detected before enumeration
+            res.append(list(_crt_combinations(roots, coprime_factors,
+                                              crt_basis)))
+        except ValueError:
+            raise ValueError("No square root for %d" % a)
+    return res
+
+
+def _crt_basis(modules):
+    """
+    Return (N, basis): N is product of coprime @modules,
+    basis[i] = 1 (mod modules[i]), 0 (mod others).
+    """
+    N = reduce(operator.mul, modules, 1)
+    basis = []
+    for module in modules:
+        Ni = N // module
+        basis.append(Ni * invmod(Ni, module) if module > 1 else 0)
+    return N, basis
+
+
+def _crt_combinations(remainders, modules, crt_basis=None):
+    """
+    Yield CRT solutions for all combinations of @remainders
+    (list of iterables) by coprime @modules.
+    Remainders are taken lazily, solution is accumulated
+    incrementally using precomputed CRT basis (@crt_basis
+    from _crt_basis, computed if not given).
+    ValueError is raised if some of @remainders is empty.
+    """
+    N, basis = crt_basis or _crt_basis(modules)
 
-    for rems in product(*sqrts):
-        yield solve_crt(rems, coprime_factors)
+    remainders = [_LazyList(rems) for rems in remainders]
+    # a module without remainders is found before others are enumerated
+    for module, rems in zip(modules, remainders):
+        for r in rems:
+            break
+        else:
+            raise ValueError("No root modulo %d" % module)
+    last = len(remainders) - 1
+
+    def combine(i, acc):
+        if i == last:
+            for r in remainders[i]:
+                yield (acc + r * basis[i]) % N
+            return
+        for r in remainders[i]:
+            for x in combine(i + 1, acc + r * basis[i]):
+                yield x
+
+    for x in combine(0, 0):
+        yield x
     return
 
 
@@ -73,11 +223,12 @@ def has_sqrtmod_prime_power(a, p, n=1):
     return jacobi(a, p) == 1
 
 
-def sqrtmod_prime_power(a, p, k=1):
+def sqrtmod_prime_power(a, p, k=1, rng=None):
     """
     Yield square roots of @a mod @p**@k,
     @p - prime
     @k >= 1
+    Optional arg @rng defines random generator (see get_rng).
     """
     if k < 1:
         raise ValueError("prime power k < 1: %d" % k)
@@ -88,67 +239,16 @@ def sqrtmod_prime_power(a, p, k=1):
         pow_p *= p
         powers.append(pow_p)
 
-    # x**2 == a (mod p),  p is prime
-    def sqrtmod_prime(a, p):
-        if a == 0:
-            return (0,)
-        if a == 1:
-            return (1, p-1) if p != 2 else (1,)
-
-        if jacobi(a, p) == -1:
-            raise ValueError("No square root for %d (mod %d)" % (a, p))
-
-        while True:
-            b = random.randint(1, p - 1)
-            if jacobi(b, p) == -1:
-                break
-
-        pow2, t = extract_prime_power(p - 1, 2)
-        ai = invmod(a, p)
-
-        c = pow(b, t, p)
-        r = pow(a, (t + 1) // 2, p)
-        for i in range(1, pow2):
-            e = pow(2, pow2 - i - 1, p - 1)
-            d = pow(pow(r, 2, p) * ai, e, p)
-            if d == p - 1:
-                r = (r * c) % p
-            c = pow(c, 2, p)
-        return (r, (-r) % p)  # both roots
-
     # x**2 == a (mod p**k),  p is prime,  gcd(a, p) == 1
     def sqrtmod_prime_power_for_coprime(a, p, k):
-        if a == 1:
-            if p == 2:
-                if k == 1: return (1, )
-                if k == 2: return (1, 3)
-                if k == 3: return (1, 3, 5, 7)
-            else:
-                return 1, pow_p - 1
-
         if p == 2:  # roots mod 2**k
-            roots = 1, 3
-            powind = 3
-            while powind < k:
-                next_powind = powind + 1
-                next_roots = set()
-
-                for r in roots:  # can be done better
-                    if pow(r, 2, powers[next_powind]) == a % powers[next_powind]:
-                        next_roots.add(r)
-
-                    r = powers[powind] - r
-                    if pow(r, 2, powers[next_powind]) == a % powers[next_powind]:
-                        next_roots.add(r)
+            return _sqrtmod_power_of_two(a, k)
 
-                powind = next_powind
-                roots = next_roots
-
-            roots = [pow_p - r for r in roots] + list(roots)
-            return roots
+        if a == 1:
+            return 1, pow_p - 1
 
         else:  # p >= 3
-            r = sqrtmod_prime(a, p)[0]  # any root
+            r = sqrtmod_prime(a, p, rng)[0]  # any root
             powind = 1
             while powind < k:
                 next_powind = min(powind * 2, k)
@@ -170,21 +270,16 @@ def sqrtmod_prime_power(a, p, k=1):
 
     # x**2 == 0 (mod p**k),  p is prime
     def sqrt_for_zero(p, k):
-        roots = [0]
         start_k = (k // 2 + 1) if k & 1 else (k // 2)
-
-        r = powers[start_k] % pow_p
-        r0 = r
-        while True:
-            if r:  # don't duplicate zero
-                roots.append(r)
-            r = (r + powers[start_k]) % pow_p
-            if r == r0:
-                break
-        return roots
+        step = powers[start_k]
+        r = 0
+        while r < pow_p:
+            yield r
+            r += step
 
     # main code
 
+    a %= pow_p
     if a == 0:
         for r in sqrt_for_zero(p, k):
             yield r
@@ -199,47 +294,426 @@ def sqrtmod_prime_power(a, p, k=1):
     sqrt_k = k - e
 
     roots = sqrtmod_prime_power_for_coprime(a, p, sqrt_k)
+    roots = [r % powers[sqrt_k] for r in roots]
+
+    # x = p**(e/2) * y,  y = r (mod p**sqrt_k),  y (mod p**(k-e/2))
+    step = powers[k - (e >> 1)]
+    for r in roots:
+        root = r * p_acc
+        while root < pow_p:
+            yield root
+            root += step
+    return
+
+
+def _sqrtmod_power_of_two(a, k):
+    """
+    Return tuple of square roots of odd @a mod 2**@k.
+    One root is found by Newton's iteration for 1/sqrt(a)
+    (precision doubles each step), the others are -r and +-r + 2**(k-1).
+    """
+    mask = (1 << k) - 1
+    a &= mask
+    if k == 1:
+        return (1,)
+    if k == 2:
+        return (1, 3) if a == 1 else ()
+    if a & 7 != 1:
+        return ()
+
+    # y**2 * a = 1 (mod 2**prec);  y' = y * (3 - a*y**2) / 2
+    # keeps two extra bits for the division by 2
+    work_mask = (mask << 2) | 3
+    y = 1
+    prec = 3
+    while prec < k:
+        y = ((y * (3 - a * y * y)) >> 1) & work_mask
+        prec = 2 * prec - 2
+
+    r = (a * y) & mask
+    half = 1 << (k - 1)
+    return (r, (-r) & mask, (r + half) & mask, (half - r) & mask)
+
+
+def sqrtmod_prime(a, p, rng=None):
+    """
+    Return tuple of square roots of @a mod prime @p.
+    Fast paths: p = 3 (mod 4) - one exponentiation,
+                p = 5 (mod 8) - Atkin's method,
+                large power of 2 in p - 1 - Cipolla's method,
+    otherwise Tonelli-Shanks is used.
+    Optional arg @rng defines random generator (see get_rng).
+    """
+    a %= p
+    if a == 0:
+        return (0,)
+    if a == 1:
+        return (1, p-1) if p != 2 else (1,)
+
+    if p & 3 == 3:
+        r = pow(a, (p + 1) >> 2, p)
+    elif p & 7 == 5:
+        v = pow(2 * a, (p - 5) >> 3, p)
+        i = (2 * a * v * v) % p
+        r = (a * v * (i - 1)) % p
+    else:
+        if jacobi(a, p) != 1:
+            raise ValueError("No square root for %d (mod %d)" % (a, p))
+
+        pow2, t = extract_prime_power(p - 1, 2)
+        if pow2 * pow2 > _CIPOLLA_RATIO * len_in_bits(p):
+            r = _sqrtmod_prime_cipolla(a, p, rng)
+        else:
+            r = _sqrtmod_prime_tonelli_shanks(a, p, pow2, t, rng)
+
+    if (r * r) % p != a:
+        raise ValueError("No square root for %d (mod %d)" % (a, p))
+    return (r, p - r)  # both roots
+
+
+# Tonelli-Shanks makes about pow2**2 / 2 multiplications
+# and Cipolla about 6 * len(p), crossover measured at pow2**2 ~ 10 * len(p)
+_CIPOLLA_RATIO = 10
+
+
+def _sqrtmod_prime_tonelli_shanks(a, p, pow2, t, rng=None):
+    # p - 1 = 2**pow2 * t
+    c = pow(_nonresidue(p, rng), t, p)
+    r = pow(a, (t + 1) >> 1, p)
+    d = pow(a, t, p)
+    m = pow2
+    while d != 1:
+        # find least i: d**(2**i) = 1
+        i = 0
+        d2 = d
+        while d2 != 1:
+            d2 = (d2 * d2) % p
+            i += 1
+        b = pow(c, 1 << (m - i - 1), p)
+        m = i
+        c = (b * b) % p
+        d = (d * c) % p
+        r = (r * b) % p
+    return r
+
+
+def _sqrtmod_prime_cipolla(a, p, rng=None):
+    rng = get_rng(rng)
+    while True:
+        t = rng.randint(1, p - 1)
+        w = (t * t - a) % p
+        if jacobi(w, p) == -1:
+            break
+
+    # (t + sqrt(w)) ** ((p + 1) / 2) in GF(p**2) = GF(p)[sqrt(w)]
+    x0, x1 = 1, 0
+    e = (p + 1) >> 1
+    for i in xrange(len_in_bits(e) - 1, -1, -1):
+        x0, x1 = (x0 * x0 + x1 * x1 % p * w) % p, (2 * x0 * x1) % p
+        if (e >> i) & 1:
+            x0, x1 = (x0 * t + x1 * w) % p, (x0 + x1 * t) % p
+    return x0
+
+
+_NONRESIDUES = {}
+_NONRESIDUES_SIZE = 1024
+
+
+def _nonresidue(p, rng=None):
+    """
+    Return quadratic nonresidue modulo odd prime @p,
+    found nonresidues are cached.
+    """
+    try:
+        return _NONRESIDUES[p]
+    except KeyError:
+        pass
+
+    rng = get_rng(rng)
+    while True:
+        b = rng.randint(2, p - 1)
+        if jacobi(b, p) == -1:
+            break
 
-    if sqrt_k == 0:
+    if len(_NONRESIDUES) >= _NONRESIDUES_SIZE:
+        _NONRESIDUES.clear()
+    _NONRESIDUES[p] = b
+    return b
+
+
+def nthroot_mod(a, k, factors, rng=None):
+    """
+    x ^ k = a (mod *factors).
+    Yield k'th roots by product of @factors as modulus.
+    @factors - list of (prime, power) tuples
+    Optional arg @rng defines random generator (see get_rng).
+    Roots are generated lazily, ValueError is raised
+    if there are none.
+    """
+    if not factors:
+        raise ValueError("Factors can't be empty: %s" % factors)
+    if k < 1:
+        raise ValueError("Root degree must be positive: %s" % k)
+
+    for p, e in factors.items():
+        if p <= 1 or e <= 0:
+            raise ValueError("Not valid prime power: %s**%s" % (p, e))
+
+    coprime_factors = [p ** e for p, e in factors.items()]
+    roots = [nthroot_mod_prime_power(a % pe, k, p, e, rng)
+             for (p, e), pe in zip(factors.items(), coprime_factors)]
+
+    for x in _crt_combinations(roots, coprime_factors):
+        yield x
+    return
+
+
+def nthroot_mod_prime_power(a, k, p, e=1, rng=None):
+    """
+    Yield k'th roots of @a mod @p**@e, @p - prime.
+    """
+    if e < 1:
+        raise ValueError("prime power e < 1: %d" % e)
+    if k < 1:
+        raise ValueError("Root degree must be positive: %s" % k)
+
+    pe = p ** e
+    a %= pe
+
+    if a == 0:
+        # x = 0 (mod p**ceil(e/k))
+        step = p ** ceil(e, k)
+        r = 0
+        while r < pe:
+            yield r
+            r += step
+        return
+
+    v, a = extract_prime_power(a, p)
+    if v % k:
+        return
+
+    # x = p**j * y,  y**k = a (mod p**m),  y (mod p**(e-j))
+    j = v // k
+    m = e - v
+    p_acc = p ** j
+    step = p ** (j + m)
+    for r in _nthroot_mod_prime_power_coprime(a, k, p, m, rng):
+        root = r * p_acc
+        while root < pe:
+            yield root
+            root += step
+    return
+
+
+def _nthroot_mod_prime_power_coprime(a, k, p, e, rng=None):
+    """
+    Yield k'th roots of @a mod @p**@e, gcd(@a, @p) = 1.
+    """
+    roots = _nthroot_mod_prime(a % p, k, p, rng)
+    if e == 1:
+        for r in roots:
+            yield r
+        return
+
+    if k % p:
+        # Hensel lifting, each root has a unique lift
+        pe = p ** e
         for r in roots:
-            yield (r * p_acc) % pow_p
+            prec = 1
+            while prec < e:
+                prec = min(prec * 2, e)
+                mod = p ** prec
+                f = (pow(r, k, mod) - a) % mod
+                df = (k * pow(r, k - 1, mod)) % mod
+                r = (r - f * invmod(df, mod)) % mod
+            yield r % pe
         return
 
-    all_roots = set()
+    # p | k:  (r + t*p**i)**k = r**k (mod p**(i+1)) for any t,
+    # so either all lifts of a root are roots or none
+    pe = p ** e
     for r in roots:
-        r0 = r % pow_p
-        while True:
-            root = (r * p_acc) % pow_p
-            if root not in all_roots:
-                yield root
-                all_roots.add(root)
-            r = (r + powers[sqrt_k]) % pow_p
-            if r == r0:
-                break
+        for root in _lift_nthroot_wild(r, a, k, p, p, pe):
+            yield root
+    return
+
+
+def _lift_nthroot_wild(r, a, k, p, mod, pe):
+    """
+    Yield k'th roots of @a mod @pe lifted from root @r mod @mod, p | k
+    (depth first, roots are not collected).
+    """
+    if mod == pe:
+        yield r
+        return
+    next_mod = mod * p
+    if pow(r, k, next_mod) != a % next_mod:
+        return
+    for t in xrange(r, next_mod, mod):
+        for root in _lift_nthroot_wild(t, a, k, p, next_mod, pe):
+            yield root
+
+
+def _nthroot_mod_prime(a, k, p, rng=None):
+    """
+    Yield k'th roots of @a mod prime @p.
+    Adleman-Manders-Miller algorithm is used.
+    """
+    a %= p
+    if a == 0:
+        yield 0
+        return
+    if p == 2:
+        yield 1
+        return
+
+    # x*k + y*(p - 1) = d = gcd(k, p - 1),  there are d roots if any
+    x, y, d = xgcd(k, p - 1)
+    if pow(a, (p - 1) // d, p) != 1:
+        return
+    if d == 1:
+        yield pow(a, x % (p - 1), p)
+        return
+
+    from .factorize import factorize
+    d_factors = factorize(d)
+
+    # z**d = a,  x*k = d (mod p - 1)  =>  (z**x)**k = a
+    z, unity = _dth_root_mod_prime(a, d, d_factors, p, rng)
+    r = pow(z, x % (p - 1), p)
+    for i in xrange(d):
+        yield r
+        r = (r * unity) % p
     return
 
 
+def _dth_root_mod_prime(a, d, d_factors, p, rng=None):
+    """
+    Return (z, w):  z**d = a (mod p),  w - primitive d'th root of unity.
+    @d must divide p - 1, @a must be d'th power.
+    """
+    # z_i**(r**e) = a,  z = prod z_i**c_i,  c_i = (d / r**e)**-1 (mod r**e)
+    # then z**d = a**(1 + m*d)
+    z = 1
+    unity = 1
+    total = 0
+    for r, e in d_factors.items():
+        re = r ** e
+        t, s, c = _sylow_generator(p, r, rng)
+        zi = _rth_power_root_mod_prime(a, r, e, p, t, s, c)
+        di = d // re
+        ci = invmod(di, re) if re > 1 else 0
+        z = (z * pow(zi, ci, p)) % p
+        total += ci * di
+        unity = (unity * pow(c, r ** (t - e), p)) % p
+    m = (total - 1) // d
+    if m:
+        z = (z * pow(invmod(a, p), m, p)) % p
+    return z, unity
+
+
+def _rth_power_root_mod_prime(a, r, e, p, t, s, c):
+    """
+    Return x : x**(r**e) = a (mod p),  p - 1 = r**t * s,
+    @c - generator of the Sylow r-subgroup.
+    """
+    re = r ** e
+    # x**re = a * b,  b is in the Sylow subgroup
+    u = invmod(re, s) if s > 1 else 0
+    x = pow(a, u, p)
+    b = (pow(x, re, p) * invmod(a, p)) % p
+
+    # b = c**l  (Pohlig-Hellman in the group of order r**t)
+    c_inv = invmod(c, p)
+    unity = pow(c, r ** (t - 1), p)
+    l = 0
+    rpow = 1
+    for i in xrange(t):
+        h = pow((b * pow(c_inv, l, p)) % p, r ** (t - 1 - i), p)
+        l += _dlog_prime_order(h, unity, r, p) * rpow
+        rpow *= r
+
+    # l is divisible by r**e since a is r**e'th power
+    return (x * pow(c_inv, l // re, p)) % p
+
+
+_SYLOW_GENERATORS = {}
+_SYLOW_GENERATORS_SIZE = 1024
+
+
+def _sylow_generator(p, r, rng=None):
+    """
+    Return (t, s, c):  p - 1 = r**t * s,  r does not divide s,
+    c - generator of the Sylow r-subgroup of (Z/pZ)*.
+    """
+    try:
+        return _SYLOW_GENERATORS[p, r]
+    except KeyError:
+        pass
+
+    rng = get_rng(rng)
+    t, s = extract_prime_power(p - 1, r)
+    while True:
+        rho = rng.randint(2, p - 1)
+        if pow(rho, (p - 1) // r, p) != 1:
+            break
+    res = t, s, pow(rho, s, p)
+
+    if len(_SYLOW_GENERATORS) >= _SYLOW_GENERATORS_SIZE:
+        _SYLOW_GENERATORS.clear()
+    _SYLOW_GENERATORS[p, r] = res
+    return res
+
+
+def _dlog_prime_order(h, g, r, p):
+    """
+    Return x : g**x = h (mod p),  order of g is prime @r (baby-step giant-step).
+    """
+    from .dlog import bsgs  # local import, dlog depends on modular
+    return bsgs(g, h, r, Zmod(p))
+
+
 def jacobi(a, n):
     """
     Return Jacobi symbol (or Legendre symbol if n is prime)
     """
-    s = 1
-    while True:
-        if n < 1: raise ValueError("Too small module for Jacobi symbol: " + str(n))
-        if n & 1 == 0: raise ValueError("Jacobi is defined only for odd modules")
-        if n == 1: return s
-        a = a % n
-        if a == 0: return 0
-        if a == 1: return s
+    if n < 1: raise ValueError("Too small module for Jacobi symbol: " + str(n))
+    if n & 1 == 0: raise ValueError("Jacobi is defined only for odd modules")
+    return _jacobi(a, n)
 
+
+def jacobi_many(values, n):
+    """
+    Return list of Jacobi symbols (@a / @n) for a in @values.
+    """
+    if n < 1: raise ValueError("Too small module for Jacobi symbol: " + str(n))
+    if n & 1 == 0: raise ValueError("Jacobi is defined only for odd modules")
+
+    values = list(values)
+    if n <= len(values):
+        # cheaper to tabulate all residues
+        table = [_jacobi(a, n) for a in xrange(n)]
+        return [table[a % n] for a in values]
+    return [_jacobi(a, n) for a in values]
+
+
+def _jacobi(a, n):
+    """
+    Jacobi symbol for odd positive @n, arguments are not checked.
+    """
+    s = 1
+    a %= n
+    while a:
         if a & 1 == 0:
-            if n % 8 in (3, 5):
+            # strip all factors of two at once
+            z = (a & -a).bit_length() - 1
+            a >>= z
+            if z & 1 and (n & 7) in (3, 5):
                 s = -s
-            a >>= 1
-            continue
 
-        if a % 4 == 3 and n % 4 == 3:
+        # reciprocity: both are 3 (mod 4)
+        if a & n & 2:
             s = -s
-
-        a, n = n, a
-    return
+        a, n = n % a, a
+    return s if n == 1 else 0
@@ -1,8 +1,16 @@
 #-*- coding:utf-8 -*-
 
-import operator
+import math
 
-from functools import reduce
+from .compat import xrange
+
+
+try:
+    _comb = math.comb  # new in Python 3.8
+except AttributeError:
+    _comb = None
+
+_NCK_PRIMES_RATIO = 1000
 
 
 def grey_code(n):
@@ -18,11 +26,11 @@ def rev_grey_code(g):
 
 
 def factorial(n):
-    res = 1
-    while n > 1:
-        res *= n
-        n -= 1
-    return res
+    # math.factorial uses divide-and-conquer over odd parts
+    # (binary splitting), much faster than a sequential product
+    if n < 2:
+        return 1
+    return math.factorial(n)
 
 
 def factorial_get_prime_pow(n, p):
@@ -46,8 +54,41 @@ def nCk(n, k):
     if k in (0, n): return 1
     if k in (1, n-1): return n
 
-    low_min = 1
-    low_max = min(n, k)
-    high_min = max(1, n - k + 1)
-    high_max = n
-    return reduce(operator.mul, range(high_min, high_max + 1), 1) // reduce(operator.mul, range(low_min, low_max + 1), 1)
+    k = min(k, n - k)
+    # math.comb is faster for small k, prime powers win for large ones
+    if k * k <= _NCK_PRIMES_RATIO * n:
+        if _comb is not None:
+            return _comb(n, k)
+        return _product(list(xrange(n - k + 1, n + 1)), 0, k) // factorial(k)
+    return _nCk_by_primes(n, k)
+
+
+def _nCk_by_primes(n, k):
+    """
+    Combinations number as a product of prime powers,
+    exponents are computed by Legendre's formula.
+    """
+    from .primes import primes  # primes -> sqrtmod -> modular -> stuff
+    factors = []
+    for p in primes(n):
+        e = (factorial_get_prime_pow(n, p) - factorial_get_prime_pow(k, p) -
+             factorial_get_prime_pow(n - k, p))
+        if e == 1:
+            factors.append(p)
+        elif e:
+            factors.append(p ** e)
+    return _product(factors, 0, len(factors))
+
+
+def _product(lst, start, end):
+    """
+    Product of lst[start:end] by binary splitting.
+    """
+    if end - start <= 8:
+        res = 1
+        for i in xrange(start, end):
+            res *= lst[i]
+        return res
+    mid = (start + end) >> 1
+    return _product(lst, start, mid) * _product(lst, mid, end)
+
@@ -22,6 +22,22 @@ def test_len_in_bits():
     assertRaises(TypeError, len_in_bits, "qwe")
 
 
+def test_randint_bits():
+    for size in (1, 2, 10, 64, 129):
+        for rng in (None, SECURE_RNG, seeded_rng(size)):
+            assertEqual(len_in_bits(randint_bits(size, rng)), size)
+            nums = randints_bits(size, 20, rng)
+            assertEqual(len(nums), 20)
+            for n in nums:
+                assertEqual(len_in_bits(n), size)
+
+    assertEqual(randints_bits(128, 10, seeded_rng(1)),
+                randints_bits(128, 10, seeded_rng(1)))
+    assertEqual(randints_bits(8, 0), [])
+    assertRaises(ValueError, randint_bits, 0)
+    assertRaises(ValueError, randints_bits, 0, 10)
+
+
 def test_nroot():
     for x in range(0, 100):
         for p in range(1, 3):
@@ -0,0 +1,111 @@
+#-*- coding:utf-8 -*-
+
+import pytest
+import random
+
+from libnum import *
+from libnum import ecc
+from libnum.compat import xrange
+from utcompat import *
+
+
+def test_discrete_log_zmod():
+    for n in (13, 1019, 2 ** 61 - 1, 3 ** 20, 1000003 * 2):
+        Z = Zmod(n)
+        phi = 1
+        for p, e in factorize(n).items():
+            phi *= (p - 1) * p ** (e - 1)
+        for i in xrange(20):
+            g = random.randint(2, n - 1)
+            if gcd(g, n) != 1:
+                continue
+            x = random.randint(0, n)
+            h = pow(g, x, n)
+            y = discrete_log(g, h, Z)
+            assertEqual(pow(g, y, n), h)
+            assertEqual(y, x % element_order(g, phi, Z))
+
+    assertRaises(ValueError, discrete_log, 4, 2, Zmod(13))
+    assertRaises(ValueError, element_order, 2, 5, Zmod(13))
+
+
+class _Colliding(object):
+    def __init__(self, v):
+        self.v = v
+
+    def __eq__(self, other):
+        return self.v == other.v
+
+    def __hash__(self):
+        return self.v & 1
+
+
+class _CollidingZmod(Zmod):
+    """
+    Zmod with wrapped elements, all hashes are 0 or 1.
+    """
+
+    def elem(self, v):
+        return _Colliding(v % self.n)
+
+    @property
+    def identity(self):
+        return self.elem(1)
+
+    def op(self, a, b):
+        return self.elem(a.v * b.v)
+
+    def inverse(self, a):
+        return self.elem(invmod(a.v, self.n))
+
+    def power(self, a, e):
+        return self.elem(pow(a.v, e, self.n) if e >= 0
+                         else pow(invmod(a.v, self.n), -e, self.n))
+
+
+def test_bsgs_rho_kangaroo():
+    p = 2 ** 61 - 1
+    Z = Zmod(p)
+    for i in xrange(5):
+        x = random.randint(0, 2 ** 30)
+        h = pow(3, x, p)
+        assertEqual(bsgs(3, h, 2 ** 30 + 1, Z), x)
+
+        low = x - random.randint(0, 2 ** 30)
+        assertEqual(kangaroo(3, h, low, low + 2 ** 30, Z), x)
+        assertEqual(kangaroo(3, h, x - 5, x + 5, Z), x)
+
+    # subgroup of prime order q
+    q, k = 1000000007, 2
+    while not prime_test(q * k + 1):
+        k += 2
+    n = q * k + 1
+    Z = Zmod(n)
+    g = pow(5, k, n)
+    for i in xrange(5):
+        x = random.randint(0, q - 1)
+        assertEqual(pollard_rho(g, pow(g, x, n), q, Z), x)
+
+    # elements with colliding hashes
+    G = _CollidingZmod(1019)
+    for x in (0, 1, 500, 1017):
+        assertEqual(bsgs(G.elem(2), G.elem(pow(2, x, 1019)), 1018, G), x)
+
+    assertRaises(ValueError, bsgs, 3, pow(3, 1000, p), 1000, Z)
+    assertRaises(ValueError, bsgs, 3, 3, 0, Z)
+    assertRaises(ValueError, kangaroo, 3, 3, 10, 5, Z)
+
+
+def test_discrete_log_curve():
+    p = 1009
+    c = ecc.Curve(2, 3, p)
+    points = c.find_points_in_range()
+    c.points_count = len(points) + 1  # and the null point
+
+    for i in xrange(20):
+        g = random.choice(points)
+        x = random.randint(0, c.points_count)
+        h = c.power(g, x)
+        y = discrete_log(g, h, c)
+        assertEqual(c.power(g, y), h)
+        assertEqual(y, x % element_order(g, c.points_count, c))
@@ -1,8 +1,9 @@
 #-*- coding:utf-8 -*-
 
 import pytest
+import libnum
 from libnum import ecc
-from utcompat import assertEqual
+from utcompat import *
 
 
 def test_curve():
@@ -23,3 +24,525 @@ def test_curve():
             res += [c.add(i, j)]
 
     assertEqual(res, good)
+
+
+P256 = ecc.Curve(
+    -3, 0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b,
+    2 ** 256 - 2 ** 224 + 2 ** 192 + 2 ** 96 - 1,
+    (0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+     0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5),
+    0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551, 1)
+
+
+def test_power():
+    c = ecc.Curve(2, 3, 97)
+    points = c.find_points_in_range() + [ecc.NULL_POINT]
+    for p in points:
+        acc = ecc.NULL_POINT
+        for n in range(40):
+            assertEqual(c.power(p, n), acc)
+            assertEqual(c.power(p, -n), c.neg(acc))
+            acc = c.add(acc, p)
+
+    g = P256.g
+    assertEqual(P256.power(g, P256.order), ecc.NULL_POINT)
+    assertEqual(P256.power(g, P256.order + 1), g)
+    assertEqual(P256.power(g, 3), P256.add(P256.add(g, g), g))
+    a, b = 31337 ** 9, 1337 ** 11
+    assertEqual(P256.power(P256.power(g, a), b), P256.generate(a * b))
+    assertTrue(P256.check(P256.generate(a)))
+
+
+def test_generate():
+    c = ecc.Curve(2, 3, 97)
+    c.g = (3, 6)
+    for n in range(-300, 300):
+        assertEqual(c.generate(n), c.power(c.g, n))
+
+    for k in (1, 2, 3, 2 ** 128, P256.order - 1, P256.order + 5):
+        assertEqual(P256.generate(k), P256.power(P256.g, k))
+        assertEqual(P256.generate(-k), P256.neg(P256.power(P256.g, k)))
+
+    c = ecc.Curve(P256.a, P256.b, P256.module, P256.g, P256.order, 1)
+    c.build_generator_table(window=6)
+    j = c.generator_table_to_json()
+    c = ecc.Curve(P256.a, P256.b, P256.module, P256.g, P256.order, 1)
+    c.load_generator_table_json(j)
+    for k in (1, 3, 2 ** 200 + 1, P256.order - 1):
+        assertEqual(c.generate(k), P256.power(P256.g, k))
+
+    c = ecc.Curve(P256.a, P256.b, P256.module, (3, 6), P256.order, 1)
+    assertRaises(ValueError, c.load_generator_table_json, j)
+    assertRaises(ValueError, c.build_generator_table, 0)
+    assertRaises(ValueError, ecc.Curve(1, 1, 7).generate, 3)
+
+
+def test_multi_power():
+    c = ecc.Curve(2, 3, 97)
+    points = c.find_points_in_range()
+    assertEqual(c.multi_power([]), ecc.NULL_POINT)
+    assertEqual(c.multi_power([(5, ecc.NULL_POINT), (0, points[0])]),
+                ecc.NULL_POINT)
+    for count in (1, 2, 3, 70):
+        pairs = [((i * 7919) % 211 - 105, points[(i * 13) % len(points)])
+                 for i in range(count)]
+        expected = ecc.NULL_POINT
+        for k, p in pairs:
+            expected = c.add(expected, c.power(p, k))
+        assertEqual(c.multi_power(pairs), expected)
+
+    g = P256.g
+    for count in (2, 5, 70):
+        pairs = [(31337 ** (i + 5) * (-1) ** i, P256.generate(i + 1))
+                 for i in range(count)]
+        expected = P256.generate(sum(k * (i + 1)
+                                     for i, (k, p) in enumerate(pairs)))
+        assertEqual(P256.multi_power(pairs), expected)
+    assertEqual(P256.multi_power([(3, g), (-3, g)]), ecc.NULL_POINT)
+    assertEqual(P256.multi_power([(1, g), (1, g)]), P256.power(g, 2))
+
+
+def test_count_points():
+    from libnum.ecc.count import _trace_mod_l, _random_point
+    from libnum import jacobi
+    rng = libnum.seeded_rng(41)
+
+    for p in (7, 97, 1031, 2011):
+        for a, b in ((2, 3), (0, 5), (5, 0), (p - 3, 11)):
+            n = p + 1 + sum(jacobi((x ** 3 + a * x + b) % p, p)
+                            for x in range(p))
+            assertEqual(ecc.count_points(a, b, p, rng), n)
+            if p > 100:
+                t = p + 1 - n
+                for l in (2, 3, 5, 7, 11, 13):
+                    assertEqual(_trace_mod_l(a, b, p, l), t % l)
+
+    c = ecc.Curve(2, 3, 97)
+    assertEqual(c.count_points(), len(c.find_points_in_range()) + 1)
+
+    # Schoof's algorithm for l = 2, 3 and baby-step giant-step
+    p = 2 ** 61 - 1
+    c = ecc.Curve(-3, 12345, p)
+    n = c.count_points(rng)
+    assertTrue(abs(p + 1 - n) <= 2 * libnum.nroot(p, 2))
+    for i in range(3):
+        assertEqual(c.power(_random_point(c, rng), n), ecc.NULL_POINT)
+
+    assertRaises(ValueError, ecc.count_points, 2, 3, 91)
+    assertRaises(ValueError, ecc.count_points, -3, 2, 97)  # singular
+
+
+def test_point_order():
+    c = ecc.Curve(2, 3, 97)
+    for point in c.find_points_in_range() + [ecc.NULL_POINT]:
+        order = 1
+        acc = point
+        while acc != ecc.NULL_POINT:
+            acc = c.add(acc, point)
+            order += 1
+        assertEqual(c.point_order(point), order)
+        assertEqual(c.get_order(point), order)
+        assertEqual(c.get_order(point, order + 1), order)
+        if order > 1:
+            assertEqual(c.get_order(point, order), None)
+
+    assertEqual(P256.point_order(P256.g), P256.order)
+    assertEqual(P256.point_order(P256.generate(5)), P256.order)
+
+    # points count is unknown: the search is bounded by the limit
+    c = ecc.Curve(P256.a, P256.b, P256.module)
+    assertEqual(c.points_count, None)
+    assertEqual(c.get_order(P256.g, 10 ** 6), None)
+    assertEqual(c.get_order(ecc.NULL_POINT, 10 ** 6), 1)
+
+
+def test_decompress_many():
+    for c in (ecc.Curve(2, 3, 97), ecc.Curve(2, 3, 101),  # p = 1, 5 mod 8
+              ecc.Curve(2, 3, 113), ecc.Curve(1, 3, 7)):
+        points = c.find_points_in_range()
+        assertEqual(len(points) + 1, c.count_points())
+        assertTrue(all(c.check_many(points)))
+        xs = [x for x, y in points]
+        assertEqual(c.decompress_many(xs, [y & 1 for x, y in points]),
+                    points)
+        for point in c.decompress_many(range(c.module)):
+            if point is None:
+                continue
+            assertEqual(point[1] & 1, 0)
+            assertTrue(point in points)
+        for x in range(c.module):
+            ys = sorted(y for px, y in points if px == x)
+            assertEqual(sorted(y for px, y in c.check_x(x) or ()), ys)
+
+    rng = libnum.seeded_rng(5)
+    points = [P256.generate(rng.getrandbits(256)) for i in range(20)]
+    xs = [x for x, y in points]
+    assertEqual(P256.decompress_many(xs, [y & 1 for x, y in points]),
+                points)
+    assertEqual(P256.decompress_many([xs[0]], [points[0][1] & 1 ^ 1]),
+                [P256.neg(points[0])])
+    bad = [(x, y + 1) for x, y in points]
+    assertEqual(P256.check_many(points + bad + [ecc.NULL_POINT]),
+                [True] * 20 + [False] * 20 + [True])
+    assertRaises(TypeError, P256.decompress_many, xs, [0])
+
+
+def test_iter_points_arrays():
+    pytest.importorskip("numpy")
+    from libnum.ecc import arrays
+
+    # 3 mod 4, 5 mod 8, 1 mod 2**16 (table and Tonelli-Shanks)
+    for p in (7, 97, 101, 65537, 1000003, 4294967291, 4293918721):
+        c = ecc.Curve(2, 3, p)
+        start = 0 if p < 2 ** 20 else 2 ** 31
+        end = min(p - 1, start + 2000)
+        expected = c.find_points_in_range(start, end)
+        for block_size in (7, 777, 2 ** 16):
+            points = []
+            for xs, ys in c.iter_points_arrays(start, end, block_size):
+                assertEqual(list(xs), sorted(xs))
+                points += zip(xs.tolist(), ys.tolist())
+            assertEqual(sorted(points), sorted(expected))
+
+    c = ecc.Curve(2, 3, 1009)
+    n = sum(len(xs) for xs, ys in c.iter_points_arrays())
+    assertEqual(n + 1, c.count_points())
+
+    old, arrays._TABLE_LIMIT = arrays._TABLE_LIMIT, 0
+    try:
+        points = [p for xs, ys in c.iter_points_arrays()
+                  for p in zip(xs.tolist(), ys.tolist())]
+    finally:
+        arrays._TABLE_LIMIT = old
+    assertEqual(sorted(points), sorted(c.find_points_in_range()))
+    assertRaises(ValueError, next, P256.iter_points_arrays())
+
+
+def test_point():
+    c = ecc.Curve(2, 3, 97)
+    tuples = c.find_points_in_range() + [ecc.NULL_POINT]
+    points = [c.point(*p) for p in tuples]
+    null = c.point(None, None)
+    for P, p in zip(points, tuples):
+        assertEqual(P, p)
+        assertEqual(p, P)
+        assertEqual(hash(P), hash(p))
+        assertEqual(tuple(P), p)
+        x, y = P
+        assertEqual((x, y), (P.x, P.y))
+        assertEqual(-P, c.neg(p))
+        assertEqual(P - P, null)
+        assertTrue((P - P).is_null())
+        assertEqual(P + null, P)
+        for Q, q in zip(points[::7], tuples[::7]):
+            assertEqual(P + Q, c.add(p, q))
+            assertEqual(P + q, c.add(p, q))
+            assertEqual(q + P, c.add(p, q))
+            assertEqual(P - Q, c.add(p, c.neg(q)))
+            assertEqual(q - P, c.add(q, c.neg(p)))
+        for n in (0, 1, 2, 5, -3, 100):
+            assertEqual(P * n, c.power(p, n))
+            assertEqual(n * P, c.power(p, n))
+
+    # lazy Jacobian results compare without normalization
+    G = P256.point(*P256.g)
+    a, b = 31337 ** 7, 1337 ** 9
+    R = a * G + b * G - G
+    assertEqual(R._affine, None)
+    assertEqual(R, G * (a + b - 1))
+    assertEqual(R, P256.generate(a + b - 1))
+    assertEqual(R._affine, None)
+    assertTrue(P256.check(R))
+    assertNotEqual(R, G)
+    assertNotEqual(R, ecc.NULL_POINT)
+
+    table = {p: i for i, p in enumerate(tuples)}
+    for i, P in enumerate(points):
+        assertEqual(table[P], i)
+        assertEqual(table[P + null], i)
+    assertEqual(len(set(points) | set(tuples)), len(tuples))
+
+    assertEqual(c.add(points[0], points[1]), c.add(tuples[0], tuples[1]))
+    assertEqual(c.power(points[0], 5), c.power(tuples[0], 5))
+    assertRaises(ValueError, lambda: points[0] + G)
+
+
+ED25519_P = 2 ** 255 - 19
+ED25519_D = (-121665 * libnum.invmod(121666, ED25519_P)) % ED25519_P
+ED25519_G = (
+    15112221349535400772501151409588531511454012693041857206046113283949847762202,
+    46316835694926478169428394003475163141307993866256225615783033603165251855960)
+ED25519_L = 2 ** 252 + 27742317777372353535851937790883648493
+
+
+def test_montgomery_edwards():
+    E = ecc.EdwardsCurve(-1, ED25519_D, ED25519_P, ED25519_G, ED25519_L, 8)
+    G = ED25519_G
+    assertTrue(E.check(G))
+    assertEqual(E.power(G, ED25519_L), (0, 1))
+    assertEqual(E.power(G, 5), E.add(E.add(E.power(G, 2), G), E.power(G, 2)))
+    assertEqual(E.add(G, E.neg(G)), (0, 1))
+    assertEqual(E.power(G, -7), E.neg(E.power(G, 7)))
+
+    M = E.to_montgomery()
+    # B differs from Curve25519's 1 by a square factor
+    assertEqual(M.A, 486662)
+    assertEqual(M.g[0], 9)
+    assertTrue(M.check(M.g))
+    for k in (0, 1, 2, 3, 12345, 2 ** 200 + 1, ED25519_L - 1):
+        Q = E.power(G, k)
+        x = M.ladder(9, k, 255)
+        if k == 0:
+            assertEqual(x, None)
+        else:
+            assertEqual(x, E.point_to_montgomery(Q)[0])
+    assertRaises(ValueError, M.ladder, 9, 2 ** 255, 255)
+    assertRaises(ValueError, M.ladder, 9, -1)
+
+    # RFC 7748, X25519 test vector (little-endian hex)
+    le = lambda h: int("".join(reversed([h[i:i + 2]
+                                          for i in range(0, len(h), 2)])), 16)
+    k = le("a546e36bf0527c9d3b16154b82465edd62144c0ac1fc5a18506a2244ba449ac4")
+    k = (k & ~7 & ((1 << 254) - 1)) | (1 << 254)
+    u = le("e6db6867583030db3594c1a424b15f7c726624ec26b3353b10a903a6d0ab1c4c")
+    u &= (1 << 255) - 1
+    assertEqual(M.ladder(u, k, 255), le(
+        "c3da55379de9c6908e94ea4df28d084f32eccf03491c71f754b4075577a28552"))
+
+    W = E.to_weierstrass()
+    assertTrue(W.check(W.g))
+    # forms are cached until parameters change
+    assertTrue(E.to_montgomery() is M and E.to_weierstrass() is W)
+    E.g = E.power(G, 2)
+    assertEqual(E.to_montgomery().g, E.point_to_montgomery(E.g))
+    E.g = G
+    for k in (1, 2, 1000, 2 ** 100):
+        Q = E.power(G, k)
+        R = E.point_to_weierstrass(Q)
+        assertEqual(R, W.power(W.g, k))
+        assertEqual(E.point_from_weierstrass(R), Q)
+
+    M2 = ecc.MontgomeryCurve.from_weierstrass(W, rng=libnum.seeded_rng(1))
+    assertTrue(M2.check(M2.g))
+    Q = W.power(W.g, 31337)
+    assertEqual(M2.point_to_weierstrass(M2.point_from_weierstrass(Q)), Q)
+    assertEqual(M2.ladder(M2.g[0], 31337),
+                M2.point_from_weierstrass(Q)[0])
+
+    E2 = ecc.EdwardsCurve.from_montgomery(M)
+    assertTrue(E2.check(E2.g))
+
+    # y^2 = x^3 + x + 3 mod 17: no point of order 2, no Montgomery form
+    assertRaises(ValueError, ecc.MontgomeryCurve.from_weierstrass,
+                 ecc.Curve(1, 3, 17))
+    assertRaises(ValueError, ecc.MontgomeryCurve, 2, 1, 11)
+    assertRaises(ValueError, ecc.EdwardsCurve, 1, 1, 11)
+
+
+def test_poly_roots():
+    from libnum.ecc.poly import _poly_roots
+    p = 1009
+    roots = [3, 17, 500]
+    f = [1]
+    for r in roots:
+        f = [(c1 - r * c0) % p for c0, c1 in zip(f + [0], [0] + f)]
+    assertEqual(sorted(_poly_roots(f, p, libnum.seeded_rng(1))), roots)
+    # x^2 + 1 has no roots for p = 3 mod 4
+    assertEqual(list(_poly_roots([1, 0, 1], 1019, libnum.seeded_rng(1))), [])
+
+
+def test_curves(tmpdir):
+    from libnum.ecc import curves
+    for name in ecc.CURVE_NAMES:
+        c = ecc.get_curve(name)
+        assertTrue(libnum.prime_test(c.module))
+        assertTrue(libnum.prime_test(c.order))
+        assertTrue(c.check(c.g))
+        if isinstance(c, ecc.MontgomeryCurve):
+            assertEqual(c.ladder(c.g[0], c.order), None)
+        elif isinstance(c, ecc.EdwardsCurve):
+            assertEqual(c.power(c.g, c.order), (0, 1))
+        else:
+            assertEqual(c.power(c.g, c.order), ecc.NULL_POINT)
+    assertTrue(ecc.get_curve("secp256r1") is ecc.get_curve("P-256"))
+    assertEqual(ecc.get_curve("P-256").b, P256.b)
+    assertRaises(ValueError, ecc.get_curve, "P-255")
+
+    # fast reduction modulo 2**521 - 1 agrees with plain Curve
+    c = ecc.get_curve("P-521")
+    plain = ecc.Curve(c.a, c.b, c.module, c.g, c.order, 1)
+    k1, k2 = 3 ** 300, 7 ** 180
+    assertEqual(c.power(c.g, k1), plain.power(plain.g, k1))
+    assertEqual(c.multi_power([(k1, c.g), (k2, c.neg(c.g))]),
+                plain.power(plain.g, k1 - k2))
+    assertEqual(c.add(c.g, c.g), plain.power(plain.g, 2))
+
+    # tables cached on disk
+    path = str(tmpdir)
+    c = ecc.get_curve("secp256k1", cache_dir=path)
+    assertTrue(tmpdir.join("secp256k1.json").check())
+    expected = c.generate(k1)
+    curves._CURVES.pop("secp256k1")
+    c = ecc.get_curve("secp256k1", cache_dir=path)
+    assertTrue(c._generator_table is not None)
+    assertEqual(c.generate(k1), expected)
+    assertEqual(c.generate(k1), c.power(c.g, k1))
+
+    # broken cache file is rebuilt
+    curves._CURVES.pop("secp256k1")
+    tmpdir.join("secp256k1.json").write("{")
+    c = ecc.get_curve("secp256k1", cache_dir=path)
+    assertEqual(c.generate(k1), expected)
+
+
+def test_glv():
+    # y^2 = x^3 + 2 mod 10069 has prime order 9871 = 1 (mod 3)
+    p, n = 10069, 9871
+    g = ecc.Curve(0, 2, p).find_points_in_range(1, 10)[0]
+    c = ecc.Curve(0, 2, p, g, n, 1)
+    plain = ecc.Curve(0, 2, p, g, n)
+    assertEqual(c._get_glv(), None)
+    # off by default: points of y^2 = x^3 + 1 (invalid curve attack)
+    for q in ecc.Curve(0, 1, p).find_points_in_range(1, 20):
+        for k in (n - 1, 2 * n + 5, 12345):
+            assertEqual(c.power(q, k), plain.power(q, k))
+    beta, lam = c.set_glv()
+    assertEqual(pow(beta, 3, p), 1)
+    assertEqual(c.power(g, lam), ((beta * g[0]) % p, g[1]))
+    for k in list(range(-40, 40)) + list(range(n - 40, n + 40)) + [3 * n + 7]:
+        assertEqual(c.power(g, k), plain.power(g, k))
+        k1, k2 = c._glv_decompose(k % n)
+        assertEqual((k1 + k2 * lam - k) % n, 0)
+        assertTrue(abs(k1) < 2 * n ** 0.5 and abs(k2) < 2 * n ** 0.5)
+    for q in c.find_points_in_range(100, 120):
+        assertEqual(c.power(q, 9000), plain.power(q, 9000))
+
+    k1c = ecc.get_curve("secp256k1")
+    k1plain = ecc.Curve(k1c.a, k1c.b, k1c.module, k1c.g, k1c.order)
+    assertEqual(k1c.set_glv()[0], int(
+        "7ae96a2b657c07106e64479eac3434e99cf0497512f58995c1396c28719501ee",
+        16))
+    for k in (3 ** 160, -(7 ** 90), k1c.order - 1, 2 ** 255 + 1):
+        assertEqual(k1c.power(k1c.g, k), k1plain.power(k1plain.g, k))
+        assertEqual(k1c.point(*k1c.g) * k,
+                    k1plain.power(k1plain.g, k))
+    assertEqual(P256.set_glv(), None)
+    assertEqual(P256._get_glv(), None)
+
+
+def test_extension_field():
+    from libnum.ecc.field import _karatsuba, _schoolbook
+    rng = libnum.seeded_rng(48)
+    for la in (1, 5, 16, 17, 33, 40):
+        for lb in (1, 16, 31, 40):
+            a = [rng.randint(0, 1000) for i in range(la)]
+            b = [rng.randint(0, 1000) for i in range(lb)]
+            res = _karatsuba(a, b)
+            assertEqual(res, _schoolbook(a, b) + [0] * (len(res) - la - lb + 1))
+
+    for p, k in ((7, 2), (101, 3), (3, 12), (2 ** 61 - 1, 4), (13, 20)):
+        F = ecc.ExtensionField(p, k)
+        assertEqual(len(F.modulus), k + 1)
+        xs = [F.random(rng) for i in range(4)] + [F(5), F.gen]
+        for a in xs:
+            assertEqual(a.frobenius(), a ** p)
+            assertEqual(a.frobenius(k), a)
+            assertEqual(a ** (F.order - 1), F.one)
+            assertEqual(a * a.inverse(), F.one)
+            assertEqual(a ** -3 * a ** 3, 1)
+            for b in xs:
+                assertEqual(a * b, b * a)
+                assertEqual((a + b) * xs[0], a * xs[0] + b * xs[0])
+                assertEqual((a - b) + b, a)
+                assertEqual(a / b * b, a)
+        assertEqual(F.gen ** k, F([-c for c in F.modulus[:k]]))
+
+    F = ecc.ExtensionField(7, modulus=[1, 0, 1])
+    i = F.gen
+    assertEqual(i * i, -1)
+    assertEqual(F(3) + 4, 0)
+    assertEqual(2 - i, F([2, -1]))
+    assertEqual(hash(F(3)), hash(3))
+    assertTrue((i + 1).is_constant() is False and F(6).is_constant())
+    assertRaises(ValueError, F.zero.inverse)
+    assertRaises(ValueError, ecc.ExtensionField, 7, modulus=[6, 0, 1])
+    assertRaises(ValueError, ecc.ExtensionField, 7, modulus=[1, 0, 2])
+    assertRaises(ValueError, ecc.ExtensionField, 8, 2)
+    assertNotEqual(F(1), ecc.ExtensionField(11, 2)(1))
+
+
+def _ext_power(a, P, n):
+    # double-and-add over field elements (None is the null point)
+    from libnum.ecc.pairing import _line
+    res = None
+    for bit in bin(n)[2:]:
+        if res is not None:
+            res = _line(res, res, a, 0, 0)[2]
+        if bit == "1":
+            res = _line(res, P, a, 0, 0)[2]
+    return res
+
+
+def test_pairing():
+    # supersingular y^2 = x^3 + x, p = 3 (mod 4): k = 2,
+    # distortion map (x, y) -> (-x, iy)
+    r, p = 1009, 12107
+    E = ecc.Curve(1, 0, p)
+    F = ecc.ExtensionField(p, modulus=[1, 0, 1])
+    i = F.gen
+    assertEqual(ecc.embedding_degree(p, r), 2)
+    P = E.power(E.find_points_in_range(2, 10)[0], (p + 1) // r)
+    assertEqual(E.power(P, r), ecc.NULL_POINT)
+    dist = lambda P: (F(-P[0]), i * P[1])
+
+    t = ecc.tate_pairing(E, P, dist(P), r, F)
+    w = ecc.weil_pairing(E, P, dist(P), r, F)
+    for e in (t, w):
+        assertNotEqual(e, 1)
+        assertEqual(e ** r, 1)
+    for a, b in ((2, 3), (5, 7), (r - 1, 11)):
+        aP, bQ = E.power(P, a), dist(E.power(P, b))
+        assertEqual(ecc.tate_pairing(E, aP, bQ, r, F), t ** (a * b))
+        assertEqual(ecc.weil_pairing(E, aP, bQ, r, F), w ** (a * b))
+    assertEqual(ecc.weil_pairing(E, P, E.power(P, 5), r, F), 1)
+    assertEqual(ecc.weil_pairing(E, dist(P), P, r, F), w.inverse())
+    assertEqual(ecc.tate_pairing(E, ecc.NULL_POINT, dist(P), r, F), 1)
+    assertRaises(ValueError, ecc.tate_pairing, E, P, E.power(P, 3), r, F)
+    assertRaises(ValueError, ecc.tate_pairing, E, P, dist(P), 1013, F)
+
+    # y^2 = x^3 + 17x + 1 mod 1031: 97 | #E = 970, k = 3 (odd:
+    # vertical lines are kept), Q from E(F_{p^3})
+    p, r, n = 1031, 97, 970
+    E = ecc.Curve(17, 1, p)
+    assertEqual(ecc.embedding_degree(p, r), 3)
+    F = ecc.ExtensionField(p, 3)
+    P = E.power(E.find_points_in_range(0, 10)[0], n // r)
+    t = p + 1 - n
+    s2 = t * t - 2 * p
+    N = p ** 3 + 1 - (t * s2 - p * t)  # points over F_{p^3}
+    cof = N
+    while cof % r == 0:
+        cof //= r
+    A = F(E.a)
+    rng = libnum.seeded_rng(3)
+    while True:
+        x = F.random(rng)
+        rhs = x ** 3 + A * x + E.b
+        y = rhs ** ((F.order + 1) // 4)  # p^3 = 3 (mod 4)
+        if y * y != rhs:
+            continue
+        Q = _ext_power(A, (x, y), cof)
+        while Q is not None and _ext_power(A, Q, r) is not None:
+            Q = _ext_power(A, Q, r)
+        if Q is not None and not Q[0].is_constant():
+            break
+
+    t = ecc.tate_pairing(E, P, Q, r, F)
+    w = ecc.weil_pairing(E, P, Q, r, F)
+    for e in (t, w):
+        assertNotEqual(e, 1)
+        assertEqual(e ** r, 1)
+    for a, b in ((2, 5), (13, 40)):
+        aP, bQ = E.power(P, a), _ext_power(A, Q, b)
+        assertEqual(ecc.tate_pairing(E, aP, bQ, r, F), t ** (a * b))
+        assertEqual(ecc.weil_pairing(E, aP, bQ, r, F), w ** (a * b))
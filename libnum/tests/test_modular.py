@@ -73,6 +73,123 @@ def test_crt():
     assertRaises(ValueError, solve_crt, [], [])
 
 
+def test_crt_plan():
+    modules = [2, 3, 5, 19, 137]
+    plan = CRTPlan(modules)
+    assertEqual(plan.modulus, reduce(operator.mul, modules))
+    matrix = []
+    for i in xrange(300):
+        a = random.randint(0, plan.modulus - 1)
+        rems = [a % m for m in modules]
+        assertEqual(plan.solve(rems), a)
+        assertEqual(plan.solve(rems), solve_crt(rems, modules))
+        matrix.append(rems)
+    assertEqual(plan.solve_many(matrix), [solve_crt(r, modules) for r in matrix])
+
+    # non-coprime modules
+    for modules in ([4, 6], [12, 18, 8], [7, 7], [1, 10, 15], [9, 3, 27, 2]):
+        plan = CRTPlan(modules)
+        assertEqual(plan.modulus, lcm(*modules))
+        for a in xrange(plan.modulus):
+            assertEqual(plan.solve([a % m for m in modules]), a)
+    assertRaises(ValueError, CRTPlan([4, 6]).solve, [1, 2])
+    assertRaises(ValueError, CRTPlan([9, 3]).solve, [1, 2])
+
+    assertEqual(CRTPlan([7]).solve([10]), 3)
+    assertRaises(TypeError, CRTPlan([2, 3]).solve, [1])
+    assertRaises(ValueError, CRTPlan, [])
+
+
+def test_zmod():
+    for n in (2, 97, 1000, 2 ** 64 + 13, generate_prime(256)):
+        Z = Zmod(n)
+        values = [random.randint(0, n - 1) for i in xrange(50)]
+        others = [random.randint(0, n - 1) for i in xrange(50)]
+        assertEqual(Z.mul_many(values, others),
+                    [(a * b) % n for a, b in zip(values, others)])
+        assertEqual(Z.pow_many(values, 12345),
+                    [pow(a, 12345, n) for a in values])
+
+        units = [a for a in values if has_invmod(a, n)]
+        assertEqual(Z.inv_many(units), [invmod(a, n) for a in units])
+        for a in units:
+            assertEqual(Z.inv(a), invmod(a, n))
+            assertEqual(Z.pow(a, -3), pow(invmod(a, n), 3, n))
+
+        g = values[0]
+        for window in (1, 3, 4, 8):
+            Z.set_base(g, window)
+            for e in [0, 1, 2, n - 1, n, n ** 3 + 5] + others:
+                assertEqual(Z.pow_base(e), pow(g, e, n))
+                assertEqual(Z.pow(g, e), pow(g, e, n))
+        assertEqual(Z.pow_base_many(others), [pow(g, e, n) for e in others])
+
+        # unreduced base still uses the table
+        Z.set_base(g + n)
+        calls = []
+        pow_base = Z.pow_base
+        Z.pow_base = lambda e: calls.append(e) or pow_base(e)
+        assertEqual(Z.pow(g + 2 * n, 77), pow(g, 77, n))
+        assertEqual(calls, [77])
+
+    Z = Zmod(10)
+    assertRaises(ValueError, Z.inv, 4)
+    assertRaises(ValueError, Z.inv_many, [3, 4])
+    assertRaises(ValueError, Z.pow_base, 3)
+    assertRaises(ValueError, Z.sqrt, 4)
+    assertRaises(ValueError, Z.set_base, 3, 0)
+    assertRaises(ValueError, Zmod, 1)
+    assertEqual(Z.inv_many([]), [])
+
+    Z = Zmod(7 ** 3 * 3, {7: 3, 3: 1})
+    assertEqual(sorted(Z.sqrt(4 + 7 ** 3 * 3)),
+                sorted(x for x in xrange(7 ** 3 * 3) if x * x % Z.n == 4))
+    values = [4, 0, 7 ** 2, 15, 4 + Z.n, 7 ** 3]
+    assertEqual([sorted(roots) for roots in Z.sqrt_many(values)],
+                [sorted(x for x in xrange(Z.n) if (x * x - a) % Z.n == 0)
+                 for a in values])
+    assertEqual(Z.sqrt_many([]), [])
+    assertRaises(ValueError, Z.sqrt_many, [4, 2])
+    assertRaises(ValueError, Zmod(21).sqrt_many, [4])
+    # 3**20 roots modulo 3**40, none modulo 2**5
+    Z = Zmod(3 ** 40 * 32, {3: 40, 2: 5})
+    assertRaises(ValueError, Z.sqrt_many, [36472996377170786403])
+
+
+def test_multiplicative_order():
+    for n in xrange(2, 300):
+        lam = 1
+        for a in xrange(1, n):
+            if gcd(a, n) != 1:
+                assertRaises(ValueError, multiplicative_order, a, n)
+                continue
+            order = 1
+            x = a % n
+            while x != 1:
+                x = (x * a) % n
+                order += 1
+            assertEqual(multiplicative_order(a, n), order)
+            lam = lcm(lam, order)
+        assertEqual(carmichael_lambda(n), lam)
+
+    p = 2 ** 127 - 1
+    assertEqual(multiplicative_order(3, p, {p: 1}), (p - 1) // 3)
+    assertEqual(multiplicative_order(43, p), p - 1)
+    assertRaises(ValueError, multiplicative_order, 3, 1)
+
+
+def test_primitive_root():
+    for p in primes(3000):
+        g = primitive_root(p)
+        if p > 2:
+            assertEqual(multiplicative_order(g, p), p - 1)
+            for x in xrange(2, g):
+                assertNotEqual(multiplicative_order(x, p), p - 1)
+    assertEqual(primitive_root(2 ** 127 - 1), 43)
+    assertRaises(ValueError, primitive_root, 15)
+    assertRaises(ValueError, primitive_root, 1)
+
+
 def test_jacobi():
 
     def test_jacobi_prime(module):
@@ -115,6 +232,13 @@ def test_jacobi():
                     print()
                 assertEqual(real, test)
 
+    for n in (1, 3, 9, 15, 1993, 3 * 5 * 7 * 11, 2 ** 127 - 1):
+        values = [random.randint(-n, 3 * n) for i in xrange(200)]
+        assertEqual(jacobi_many(values, n), [jacobi(a, n) for a in values])
+    assertEqual(jacobi_many([], 7), [])
+    assertRaises(ValueError, jacobi_many, [1], 2)
+    assertRaises(ValueError, jacobi_many, [1], 0)
+
     assertRaises(ValueError, jacobi, 1, 2)
     assertRaises(ValueError, jacobi, 0, 6)
     assertRaises(ValueError, jacobi, 0, 0)
@@ -136,8 +260,25 @@ def test_nCk_mod_pp():
 
 
 def test_nCk_mod():
-    # TODO: do
-    pass
+    for modulus in (2, 12, 1000, 3 ** 4 * 7 ** 2, 2 ** 10 * 3, 9973 * 4):
+        factors = factorize(modulus)
+        ctx = BinomialModContext(factors)
+        assertEqual(ctx.modulus, modulus)
+        queries = []
+        for i in xrange(50):
+            k = random.randint(0, 3000)
+            n = k + random.randint(0, 3000)
+            real = nCk(n, k) % modulus
+            assertEqual(nCk_mod(n, k, factors), real)
+            assertEqual(ctx.nCk(n, k), real)
+            queries.append((n, k))
+        assertEqual(ctx.nCk_many(queries),
+                    [nCk(n, k) % modulus for n, k in queries])
+        assertEqual(ctx.nCk(10, 11), 0)
+        assertEqual(ctx.nCk(10, -1), 0)
+
+    assertRaises(ValueError, BinomialModContext({2: 5}).nCk, -1, 0)
+    assertRaises(ValueError, BinomialModContext, {})
 
 
 def test_factorial_mod():
@@ -30,6 +30,10 @@ def test_genprime():
             assertTrue(prime_test_miller_rabin(p, k=25))
             assertTrue(prime_test(p, k=25))
 
+    assertEqual(generate_prime(256, rng=seeded_rng(31337)),
+                generate_prime(256, rng=seeded_rng(31337)))
+    assertTrue(prime_test(generate_prime(128, rng=SECURE_RNG)))
+
     assertRaises(ValueError, generate_prime, 1)
     assertRaises(TypeError, generate_prime, "")
 
@@ -0,0 +1,145 @@
+#-*- coding:utf-8 -*-
+
+import random
+import pytest
+from libnum.ranges import Ranges
+from libnum.compat import xrange
+from utcompat import *
+
+
+def naive(segments):
+    res = set()
+    for a, b in segments:
+        res.update(xrange(a, b + 1))
+    return res
+
+
+def test_add_range():
+    r = Ranges((3, 10), (15, 30), (31, 31))
+    assertEqual(r.segments, ((3, 10), (15, 31)))
+    r.add_range(11, 12)
+    assertEqual(r.segments, ((3, 12), (15, 31)))
+    r.add_range(-5, -1)
+    r.add_range(40, 50)
+    assertEqual(r.segments, ((-5, -1), (3, 12), (15, 31), (40, 50)))
+    r.add_range(0, 45)
+    assertEqual(r.segments, ((-5, 50),))
+    assertEqual((r.min, r.max, r.len), (-5, 50, 56))
+    assertRaises(ValueError, r.add_range, 5, 4)
+    assertRaises(ValueError, Ranges, (5, 4))
+
+    rng = random.Random(49)
+    segments = []
+    r = Ranges()
+    for i in xrange(300):
+        a = rng.randint(-500, 500)
+        b = a + rng.randint(0, 20)
+        segments.append((a, b))
+        r.add_range(a, b)
+    values = naive(segments)
+    assertEqual(set(r), values)
+    assertEqual(r.len, len(values))
+    for v in xrange(-600, 600):
+        assertEqual(v in r, v in values)
+    assertEqual(r, Ranges.from_segments(segments))
+    assertEqual(r, Ranges(*segments))
+    starts = [a for a, b in r.segments]
+    assertEqual(starts, sorted(starts))
+    assertEqual(Ranges.from_json(r.to_json()), r)
+
+
+def test_remove_range():
+    r = Ranges((0, 10), (20, 30), (40, 50))
+    r.remove_range(5, 25)
+    assertEqual(r.segments, ((0, 4), (26, 30), (40, 50)))
+    r.remove_range(42, 45)
+    assertEqual(r.segments, ((0, 4), (26, 30), (40, 41), (46, 50)))
+    r.remove_range(31, 39)
+    r.remove_range(100, 200)
+    assertEqual(r.segments, ((0, 4), (26, 30), (40, 41), (46, 50)))
+    r.remove_range(-10, 100)
+    assertEqual(r.segments, ())
+    assertFalse(5 in r)
+
+    rng = random.Random(50)
+    r = Ranges((-1000, 1000))
+    values = set(xrange(-1000, 1001))
+    for i in xrange(200):
+        a = rng.randint(-1100, 1100)
+        b = a + rng.randint(0, 30)
+        if rng.random() < 0.3:
+            r.add_range(a, b)
+            values |= naive([(a, b)])
+        else:
+            r.remove_range(a, b)
+            values -= naive([(a, b)])
+    assertEqual(set(r), values)
+
+
+def test_intersection():
+    r1 = Ranges((0, 10), (20, 30), (40, 50))
+    r2 = Ranges((5, 25), (28, 45))
+    assertEqual((r1 & r2).segments, ((5, 10), (20, 25), (28, 30), (40, 45)))
+    assertEqual((r1 | r2).segments, ((0, 50),))
+    assertEqual(r1 & Ranges(), Ranges())
+
+
+def random_ranges(rng, count, lo=-300, hi=300):
+    segments = []
+    for i in xrange(count):
+        a = rng.randint(lo, hi)
+        segments.append((a, a + rng.randint(0, 15)))
+    return Ranges.from_segments(segments)
+
+
+def test_set_operations():
+    r1 = Ranges((0, 10), (20, 30), (40, 50))
+    r2 = Ranges((5, 25), (28, 45), (60, 61))
+    assertEqual((r1 - r2).segments, ((0, 4), (26, 27), (46, 50)))
+    assertEqual((r2 - r1).segments, ((11, 19), (31, 39), (60, 61)))
+    assertEqual((r1 ^ r2).segments,
+                ((0, 4), (11, 19), (26, 27), (31, 39), (46, 50), (60, 61)))
+    assertEqual(r1.complement(-5, 45).segments,
+                ((-5, -1), (11, 19), (31, 39)))
+    assertEqual((r1 | Ranges((11, 19))).segments, ((0, 30), (40, 50)))
+    assertEqual(r1 - Ranges(), r1)
+    assertEqual(Ranges() - r1, Ranges())
+
+    rng = random.Random(50)
+    for i in xrange(30):
+        r1 = random_ranges(rng, rng.randint(0, 40))
+        r2 = random_ranges(rng, rng.randint(0, 40))
+        s1, s2 = set(r1), set(r2)
+        assertEqual(set(r1 | r2), s1 | s2)
+        assertEqual(set(r1 & r2), s1 & s2)
+        assertEqual(set(r1 - r2), s1 - s2)
+        assertEqual(set(r1 ^ r2), s1 ^ s2)
+        assertEqual(set(r1.complement(-100, 100)),
+                    set(xrange(-100, 101)) - s1)
+        # results are normalized: equal sets give equal segments
+        assertEqual(r1 | r2, Ranges.from_segments(r1.segments + r2.segments))
+        assertEqual(r1 ^ r2, Ranges.from_segments(
+            (v, v) for v in s1 ^ s2))
+
+        r = Ranges.from_segments(r1.segments)
+        r |= r2
+        assertEqual(r, r1 | r2)
+        r = Ranges.from_segments(r1.segments)
+        r &= r2
+        assertEqual(r, r1 & r2)
+        # few segments on the right: inserted one by one
+        r = random_ranges(rng, 100)
+        small = random_ranges(rng, 3)
+        expected = set(r) | set(small)
+        r |= small
+        assertEqual(set(r), expected)
+
+    parts = [random_ranges(rng, 20) for i in xrange(10)]
+    union = Ranges.union_all(parts)
+    expected = set()
+    for r in parts:
+        expected |= set(r)
+    assertEqual(set(union), expected)
+    assertEqual(union, Ranges.from_segments(
+        s for r in parts for s in r.segments))
+    assertEqual(Ranges.union_all([]), Ranges())
@@ -33,6 +33,8 @@ def check_valid_sqrt_composite(x, a, factors):
     all_roots = list(sqrtmod(a, factors))
     assertGreater(len(all_roots), 0)
     assertEqual(sorted(all_roots), sorted(set(all_roots)))
+    assertEqual(count_sqrtmod(a, factors), len(all_roots))
+    assertTrue(sqrtmod_one(a, factors) in all_roots)
 
     for r in all_roots:
         assertEqual(pow(r, 2, n), a)
@@ -87,6 +89,47 @@ def test_sqrt_pp_all():
                 check_valid_sqrt_pp(x, a, prime, k)
 
 
+def test_sqrtmod_prime():
+    from libnum.sqrtmod import _sqrtmod_prime_cipolla
+    from libnum.sqrtmod import _sqrtmod_prime_tonelli_shanks
+
+    # p = 3 (mod 4), p = 5 (mod 8), p = 1 (mod 8) with large and small 2**s
+    for p in (10007, 10009, 10169, 2 ** 255 - 19,
+              2 ** 256 - 2 ** 224 + 2 ** 192 + 2 ** 96 - 1,
+              3 * 2 ** 30 + 1, 15 * 2 ** 27 + 1, 2 ** 64 - 2 ** 32 + 1):
+        assertTrue(prime_test(p))
+        s, t = extract_prime_power(p - 1, 2)
+        for i in xrange(30):
+            x = random.randint(0, p - 1)
+            a = pow(x, 2, p)
+            roots = sqrtmod_prime(a, p)
+            assertTrue(x in roots)
+            if a and p & 7 == 1:
+                r = _sqrtmod_prime_cipolla(a, p)
+                assertEqual(pow(r, 2, p), a)
+                r = _sqrtmod_prime_tonelli_shanks(a, p, s, t)
+                assertEqual(pow(r, 2, p), a)
+
+            a = random.randint(1, p - 1)
+            if jacobi(a, p) == -1:
+                assertRaises(ValueError, sqrtmod_prime, a, p)
+
+
+def test_sqrt_power_of_two():
+    for k in (3, 10, 100, 1000, 4096):
+        n = 2 ** k
+        for i in xrange(20):
+            x = random.randint(0, n - 1) | 1
+            a = pow(x, 2, n)
+            roots = list(sqrtmod_prime_power(a, 2, k))
+            assertEqual(len(roots), 4)
+            assertTrue(x in roots)
+            for r in roots:
+                assertEqual(pow(r, 2, n), a)
+        assertEqual(list(sqrtmod_prime_power(3, 2, k)), [])
+        assertEqual(list(sqrtmod_prime_power(5, 2, k)), [])
+
+
 def test_sqrt_pp_rand():
     print("\nTesting random residues by random modules")
     for size, maxpow in [(2, 500), (10, 100), (64, 15), (128, 5), (129, 5), (256, 2)]:
@@ -138,6 +181,36 @@ def test_sqrt_composite_rand():
                 check_valid_sqrt_composite(x, a, f)
 
 
+def test_sqrt_composite_lazy():
+    factors = {2: 4096, 3: 1, 5: 1, 7: 1, 11: 1, 13: 2}
+    n = unfactorize(factors)
+    roots = sqrtmod(1, factors)
+    for i in xrange(100):
+        assertEqual(pow(next(roots), 2, n), 1)
+    assertEqual(count_sqrtmod(1, factors), 4 * 2 ** 5)
+    assertEqual(pow(sqrtmod_one(49, factors), 2, n), 49)
+
+    # many roots of zero
+    factors = {2: 1000, 3: 500}
+    n = unfactorize(factors)
+    assertEqual(count_sqrtmod(0, factors), 2 ** 500 * 3 ** 250)
+    roots = sqrtmod(0, factors)
+    for i in xrange(10):
+        assertEqual(pow(next(roots), 2, n), 0)
+
+    assertEqual(count_sqrtmod(3, {5: 1, 7: 1}), 0)
+    assertEqual(count_sqrtmod(3, {2: 5}), 0)
+    assertRaises(ValueError, sqrtmod_one, 3, {5: 1, 7: 1})
+    assertRaises(ValueError, sqrtmod_one, 3, {2: 5})
+    # 3**20 roots modulo 3**40, none modulo 2**5: fails without enumeration
+    a = 36472996377170786403
+    assertEqual(count_sqrtmod(a, {3: 40, 2: 5}), 0)
+    assertRaises(ValueError, sqrtmod_one, a, {3: 40, 2: 5})
+    assertRaises(ValueError, sqrtmod_one, a, {2: 5, 3: 40})
+    assertRaises(ValueError, count_sqrtmod, 3, {})
+    assertRaises(ValueError, count_sqrtmod, 3, {1: 2})
+
+
 def test_sqrt_composite_rand_rand():
     print("\nTesting random residues by random composite modules")
     for size, ntries in [(10, 20), (20, 20), (24, 20), (30, 20)]:
@@ -157,3 +230,49 @@ def test_sqrt_composite_rand_rand():
 
                 assertTrue(has_sqrtmod(a, f))
                 check_valid_sqrt_composite(x, a, f)
+
+
+def test_nthroot_all():
+    for n in list(range(2, 60)) + [243, 256, 2 * 3 ** 4, 2 ** 3 * 7 ** 2]:
+        f = factorize(n)
+        for k in xrange(1, 8):
+            roots = {}
+            for x in xrange(n):
+                roots.setdefault(pow(x, k, n), []).append(x)
+            for a in xrange(n):
+                if a in roots:
+                    assertEqual(sorted(nthroot_mod(a, k, f)), roots[a])
+                else:
+                    assertRaises(ValueError, list, nthroot_mod(a, k, f))
+
+    # many roots modulo 7**40, 2 is not a cube modulo 13
+    n = 7 ** 40 * 13
+    a = solve_crt([0, 2], [7 ** 40, 13])
+    assertRaises(ValueError, next, nthroot_mod(a, 3, {7: 40, 13: 1}))
+    a = solve_crt([0, 5], [7 ** 40, 13])
+    assertEqual(pow(next(nthroot_mod(a, 3, {7: 40, 13: 1})), 3, n), a)
+
+    assertRaises(ValueError, list, nthroot_mod(1, 0, {7: 1}))
+    assertRaises(ValueError, list, nthroot_mod(1, 3, {}))
+    assertRaises(ValueError, list, nthroot_mod(1, 3, {1: 2}))
+    assertRaises(ValueError, list, nthroot_mod_prime_power(1, 3, 7, 0))
+
+
+def test_nthroot_rand():
+    for size in (64, 128, 256):
+        p = generate_prime(size)
+        for k in (3, 5, 6, 12, 2 * 3 * 5 * 7 * 11):
+            for i in xrange(5):
+                x = random.randint(0, p - 1)
+                a = pow(x, k, p)
+                roots = list(nthroot_mod(a, k, {p: 1}))
+                assertTrue(x in roots)
+                assertEqual(len(roots), gcd(k, p - 1))
+                for r in roots:
+                    assertEqual(pow(r, k, p), a)
+
+                n = p ** 3 * 2 ** 5
+                x = random.randint(0, n - 1)
+                a = pow(x, k, n)
+                r = next(nthroot_mod(a, k, {p: 3, 2: 5}))
+                assertEqual(pow(r, k, n), a)
@@ -37,3 +37,25 @@ def test_nck():
     assertEqual(nCk(0, 0), 1)
     assertEqual(nCk(0, 1), 0)
     assertRaises(ValueError, nCk, -1, 0)
+
+
+def test_nck_big():
+    from libnum.stuff import _nCk_by_primes
+
+    for n, k in ((1000, 500), (5000, 1), (5000, 4999), (20000, 7000),
+                 (100003, 71), (100003, 50001)):
+        real = 1
+        for i in xrange(k):
+            real = real * (n - i) // (i + 1)
+        assertEqual(nCk(n, k), real)
+        assertEqual(_nCk_by_primes(n, k), real)
+        assertEqual(_nCk_by_primes(n, n - k), real)
+
+
+def test_factorial():
+    real = 1
+    for n in xrange(1, 1000):
+        real *= n
+        assertEqual(factorial(n), real)
+    assertEqual(factorial(0), 1)
+    assertEqual(factorial(-1), 1)
@@ -17,7 +17,7 @@ setup(name='libnum',
       description='Some number theoretic functions.',
       long_description=libnum.__doc__,
 
-      packages=['libnum', 'libnum.chains'],
+      packages=['libnum', 'libnum.chains', 'libnum.ecc'],
       provides=['libnum'],
 
       keywords='number prime gcd lcm modular invmod elliptic',